@@ -9,6 +9,7 @@ import re
 import json
 from datetime import datetime
 from pathlib import Path
+import shutil
 import subprocess
 from collections import defaultdict
 import argparse
@@ -21,7 +22,8 @@ class DashcamVideoMerger:
             config_path = Path(__file__).parent / "config.json"
 
         self.config = self.load_config(config_path)
-        self.camera_paths = {k: Path(v) for k, v in self.config["camera_paths"].items()}
+        # 検索結果のパスが絶対パスになるよう、カメラパスは読み込み時に一度だけ解決する
+        self.camera_paths = {k: Path(v).resolve() for k, v in self.config["camera_paths"].items()}
         self.output_dir = Path(self.config["output_dir"])
         self.camera_names = self.config["camera_names"]
         self.video_pattern = re.compile(self.config["video_pattern"])
@@ -71,7 +73,9 @@ class DashcamVideoMerger:
                         'time': time_str,
                         'sequence': sequence,
                         'camera_pos': camera_pos,
-                        'filename': file_path.name
+                        'filename': file_path.name,
+                        # サイズは検索時に一度だけ取得し、情報表示で再取得しない
+                        'size': file_path.stat().st_size
                     })
 
         # 各日付・カメラ位置のファイルを時刻順にソート
@@ -85,14 +89,12 @@ class DashcamVideoMerger:
         """FFmpegで使用するファイルリストを作成"""
         list_file_path = self.output_dir / f"filelist_{date_str}_{camera_pos}.txt"
 
-        with open(list_file_path, 'w', encoding='utf-8') as f:
-            for video in video_files:
-                # FFmpegのconcatフィルター用のフォーマット
-                f.write(f"file '{video['path'].absolute()}'\n")
+        # FFmpegのconcatフィルター用のフォーマットで一括して書き込む（検索時に絶対パスになっている）
+        list_file_path.write_text("".join(f"file '{video['path']}'\n" for video in video_files), encoding='utf-8')
 
         return list_file_path
 
-    def merge_videos_for_date_camera(self, date_str, camera_pos, video_files):
+    def merge_videos_for_date_camera(self, date_str, camera_pos, video_files, formatted_date=None):
         """指定された日付・カメラ位置の動画ファイルをマージ"""
         if not video_files:
             print(f"日付 {date_str} カメラ {camera_pos} の動画ファイルが見つかりませんでした")
@@ -101,20 +103,40 @@ class DashcamVideoMerger:
         camera_name = self.camera_names.get(camera_pos, camera_pos)
         print(f"日付 {date_str} {camera_name}カメラ: {len(video_files)} 個のファイルをマージ中...")
 
+        # 出力ファイル名を生成（日付を読みやすい形式に変換。呼び出し元で変換済みならそれを使う）
+        formatted_date = formatted_date or f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        output_file = self.output_dir / f"merged_{formatted_date}_{camera_pos}.mp4"
+
+        # 1ファイルのみの場合はFFmpegを使わず、ハードリンク（不可ならコピー）で出力
+        if len(video_files) == 1:
+            try:
+                if output_file.exists():
+                    output_file.unlink()
+                try:
+                    os.link(video_files[0]['path'], output_file)
+                except OSError:
+                    shutil.copyfile(video_files[0]['path'], output_file)
+                print(f"マージ完了: {output_file}")
+                return True
+            except OSError as e:
+                print(f"ファイルコピーエラー: {e}")
+                return False
+
         # ファイルリストを作成
         list_file = self.create_file_list(video_files, date_str, camera_pos)
 
-        # 出力ファイル名を生成（日付を読みやすい形式に変換）
-        formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-        output_file = self.output_dir / f"merged_{formatted_date}_{camera_pos}.mp4"
-
         # 設定からFFmpegオプションを取得
         copy_settings = self.config["ffmpeg_settings"]["copy_codec"]
         reencode_settings = self.config["ffmpeg_settings"]["reencode_settings"]
 
+        # スレッド数（0は自動）。並列実行時は コア数 // 並列数 を目安に設定
+        threads = int(self.config["ffmpeg_settings"].get("threads", 0))
+        thread_args = ['-threads', str(threads)] if threads > 0 else []
+
         # 最初にストリームコピーを試行
         cmd_copy = [
             'ffmpeg',
+            *thread_args,
             '-f', 'concat',
             '-safe', '0',
             '-i', str(list_file),
@@ -129,6 +151,7 @@ class DashcamVideoMerger:
         # 失敗した場合の再エンコード用コマンド
         cmd_reencode = [
             'ffmpeg',
+            *thread_args,
             '-f', 'concat',
             '-safe', '0',
             '-i', str(list_file),
@@ -136,6 +159,7 @@ class DashcamVideoMerger:
             '-c:a', reencode_settings["audio_codec"],
             '-preset', reencode_settings["preset"],
             '-crf', reencode_settings["crf"],
+            *thread_args,
             '-avoid_negative_ts', 'make_zero',
             '-y',
             str(output_file)
@@ -197,7 +221,7 @@ class DashcamVideoMerger:
         print(f"  ファイル数: {len(video_files)}")
 
         # 総ファイルサイズを計算
-        total_size = sum(video['path'].stat().st_size for video in video_files)
+        total_size = sum(video['size'] for video in video_files)
         total_size_mb = total_size / (1024 * 1024)
         print(f"  総サイズ: {total_size_mb:.1f} MB")
 
@@ -243,7 +267,7 @@ class DashcamVideoMerger:
                 if show_info:
                     self.get_video_info(video_files)
 
-                if self.merge_videos_for_date_camera(date_str, camera_pos, video_files):
+                if self.merge_videos_for_date_camera(date_str, camera_pos, video_files, formatted_date):
                     success_count += 1
                 total_count += 1
                 print()
@@ -10,7 +10,10 @@
 
 import argparse
 import sys
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
+from typing import List
 
 from ..core.config import Config
 from ..parsers.file_parser import VideoFileParser
@@ -21,35 +24,52 @@ from ..ui.progress import ProgressTracker
 class DashcamVideoMergerApp:
     """ドライブレコーダー動画マージアプリケーション"""
 
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, use_cache: bool = True):
         """
         初期化
 
         Args:
             config_path: 設定ファイルのパス
+            use_cache: ファイル検索結果とストリーム情報のキャッシュを使用するかどうか
         """
         self.config = Config(config_path)
         self.config.ensure_output_dir()
 
-        self.file_parser = VideoFileParser(self.config)
-        self.video_merger = VideoMerger(self.config)
+        self.file_parser = VideoFileParser(self.config, use_cache=use_cache)
+        # ストリーム情報のキャッシュはファイル検索とマージ処理で共有する
+        self.video_merger = VideoMerger(self.config, prober=self.file_parser.prober)
 
     def display_config_info(self):
         """設定情報を表示"""
-        print(f"設定されたカメラパス:")
+        lines = ["設定されたカメラパス:"]
         for camera_pos, camera_path in self.config.camera_paths.items():
             camera_name = self.config.get_camera_name(camera_pos)
-            print(f"  {camera_name}カメラ ({camera_pos}): {camera_path}")
-        print(f"出力ディレクトリ: {self.config.output_dir}")
+            lines.append(f"  {camera_name}カメラ ({camera_pos}): {camera_path}")
+        lines.append(f"出力ディレクトリ: {self.config.output_dir}")
+        self._write_lines(lines)
 
     def display_video_info(self, video_files, camera_name):
         """動画ファイル情報を表示"""
+        self._write_lines(self._video_info_lines(video_files))
+
+    def _video_info_lines(self, video_files) -> List[str]:
+        """動画ファイル情報の表示行を作成"""
         info = self.file_parser.get_video_info(video_files)
-        if info:
-            print(f"  開始時刻: {info['start_time']}")
-            print(f"  終了時刻: {info['end_time']}")
-            print(f"  ファイル数: {info['file_count']}")
-            print(f"  総サイズ: {info['total_size_mb']:.1f} MB")
+        if not info:
+            return []
+        return [
+            f"  開始時刻: {info['start_time']}",
+            f"  終了時刻: {info['end_time']}",
+            f"  ファイル数: {info['file_count']}",
+            f"  総サイズ: {info['total_size_mb']:.1f} MB",
+        ]
+
+    @staticmethod
+    def _write_lines(lines: List[str]):
+        """複数行を1回の書き込みでまとめて出力し、出力済みの行を取り除く"""
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            lines.clear()
 
     def merge_all(self, show_info: bool = True, target_date: str = None):
         """
@@ -78,7 +98,7 @@ class DashcamVideoMergerApp:
                 return
             print(f"対象日付: {target_date[:4]}-{target_date[4:6]}-{target_date[6:8]}")
         else:
-            print(f"見つかった日付: {len(videos_by_date_camera)} 日分")
+            print(f"見つかった日付: {len({date_str for date_str, _ in videos_by_date_camera})} 日分")
         print()
 
         # プログレストラッカーを初期化
@@ -87,30 +107,62 @@ class DashcamVideoMergerApp:
             progress_style=self.config.progress_style
         )
 
-        # 日付・カメラ別にマージ処理
+        # 日付・カメラ別のマージ対象を一覧化（タプルのキーは日付→カメラ位置の順に並ぶ）
+        tasks = [
+            (date_str, camera_pos, video_files)
+            for (date_str, camera_pos), video_files in sorted(videos_by_date_camera.items())
+        ]
+
+        # ストリーム情報を全ファイル分まとめて取得し、マージ処理ではキャッシュを参照させる
+        self.file_parser.probe_all([video for _, _, video_files in tasks for video in video_files])
+
+        parallel_jobs = min(self.config.parallel_jobs, len(tasks))
+        if parallel_jobs > 1:
+            success_count = self._merge_parallel(tasks, parallel_jobs, show_info, progress_tracker)
+        else:
+            success_count = self._merge_sequential(tasks, show_info, progress_tracker)
+
+        print(f"\nマージ完了: {success_count}/{len(tasks)} カメラ分")
+
+    def _merge_sequential(self, tasks, show_info: bool,
+                          progress_tracker: ProgressTracker) -> int:
+        """
+        日付・カメラ別に1件ずつマージ
+
+        Args:
+            tasks: 日付・カメラ位置順に並んだ (日付, カメラ位置, VideoFileリスト) のリスト
+            show_info: ファイル情報を表示するかどうか
+            progress_tracker: プログレストラッカー
+
+        Returns:
+            成功したマージ数
+        """
         success_count = 0
-        total_count = 0
 
-        for date_str in sorted(videos_by_date_camera.keys()):
-            formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        # 見出し・ファイル情報は行ごとに出力せず、マージ開始の直前にまとめて書き込む
+        lines: List[str] = []
 
-            if show_info:
-                print(f"\n=== 日付: {formatted_date} ===")
+        for date_str, date_tasks in groupby(tasks, key=itemgetter(0)):
+            date_tasks = list(date_tasks)
+            # 表示用の日付はVideoFile作成時に変換済みのものを使う
+            formatted_date = date_tasks[0][2][0].formatted_date
 
-            cameras_by_date = videos_by_date_camera[date_str]
+            if show_info:
+                lines.append(f"\n=== 日付: {formatted_date} ===")
 
             # プログレス表示を開始
             if self.config.show_progress:
+                self._write_lines(lines)
                 progress_tracker.start_display()
 
             try:
-                for camera_pos in sorted(cameras_by_date.keys()):
-                    video_files = cameras_by_date[camera_pos]
+                for _, camera_pos, video_files in date_tasks:
                     camera_name = self.config.get_camera_name(camera_pos)
 
                     if show_info and not self.config.show_progress:
-                        print(f"--- {camera_name}カメラ ({camera_pos}) ---")
-                        self.display_video_info(video_files, camera_name)
+                        lines.append(f"--- {camera_name}カメラ ({camera_pos}) ---")
+                        lines.extend(self._video_info_lines(video_files))
+                    self._write_lines(lines)
 
                     # プログレス表示付きでマージ実行
                     if self.config.show_progress:
@@ -125,10 +177,9 @@ class DashcamVideoMergerApp:
 
                     if success:
                         success_count += 1
-                    total_count += 1
 
                     if not self.config.show_progress:
-                        print()
+                        lines.append("")
 
             finally:
                 # プログレス表示を停止
@@ -137,9 +188,42 @@ class DashcamVideoMergerApp:
                     progress_tracker.print_final_summary()
 
             if not self.config.show_progress:
-                print()
+                lines.append("")
+
+        self._write_lines(lines)
+        return success_count
+
+    def _merge_parallel(self, tasks, parallel_jobs: int, show_info: bool,
+                        progress_tracker: ProgressTracker) -> int:
+        """
+        日付・カメラ別のマージを並列実行
+
+        各ジョブのログは完了順に表示されるため、ファイル情報は実行前に日付・カメラ位置順でまとめて表示する
 
-        print(f"\nマージ完了: {success_count}/{total_count} カメラ分")
+        Args:
+            tasks: 日付・カメラ位置順に並んだ (日付, カメラ位置, VideoFileリスト) のリスト
+            parallel_jobs: 同時実行数
+            show_info: ファイル情報を表示するかどうか
+            progress_tracker: プログレストラッカー
+
+        Returns:
+            成功したマージ数
+        """
+        if show_info:
+            lines: List[str] = []
+            for _, date_tasks in groupby(tasks, key=itemgetter(0)):
+                date_tasks = list(date_tasks)
+                lines.append(f"\n=== 日付: {date_tasks[0][2][0].formatted_date} ===")
+                if not self.config.show_progress:
+                    for _, camera_pos, video_files in date_tasks:
+                        camera_name = self.config.get_camera_name(camera_pos)
+                        lines.append(f"--- {camera_name}カメラ ({camera_pos}) ---")
+                        lines.extend(self._video_info_lines(video_files))
+            lines.append("")
+            self._write_lines(lines)
+
+        print(f"{len(tasks)} 件のマージを {parallel_jobs} 並列で実行します")
+        return self.video_merger.merge_all(tasks, progress_tracker if self.config.show_progress else None)
 
 
 def main():
@@ -153,6 +237,7 @@ def main():
   %(prog)s -d 20250906        # 2025年9月6日のみマージ
   %(prog)s -c config/custom.json     # カスタム設定ファイルを使用
   %(prog)s --no-info          # 詳細情報を非表示
+  %(prog)s --no-cache         # キャッシュを使わずにファイルを再検索・再解析
         """
     )
 
@@ -162,12 +247,14 @@ def main():
                        help='ファイル情報の表示を省略')
     parser.add_argument('-d', '--date',
                        help='特定の日付のみをマージ（YYYYMMDD形式、例：20250906）')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='ファイル検索結果とストリーム情報のキャッシュ（.scan_cache.json / .probe_cache.json）を使用せずに再検索・再解析')
     parser.add_argument('--version', action='version', version='%(prog)s 1.0.0')
 
     args = parser.parse_args()
 
     try:
-        app = DashcamVideoMergerApp(args.config)
+        app = DashcamVideoMergerApp(args.config, use_cache=not args.no_cache)
         app.merge_all(show_info=not args.no_info, target_date=args.date)
     except KeyboardInterrupt:
         print("\n処理が中断されました")
@@ -3,7 +3,8 @@ Core module for dashcam video merger.
 Contains configuration management and data models.
 """
 
+from .cache import JsonCache
 from .config import Config
-from .models import VideoFile
+from .models import ProbeInfo, VideoFile
 
-__all__ = ["Config", "VideoFile"]
\ No newline at end of file
+__all__ = ["Config", "JsonCache", "ProbeInfo", "VideoFile"]
\ No newline at end of file
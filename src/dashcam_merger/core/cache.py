@@ -0,0 +1,62 @@
+"""
+キャッシュファイル管理モジュール
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class JsonCache:
+    """JSONファイルに永続化するキー・バリュー形式のキャッシュ"""
+
+    def __init__(self, cache_path: Path):
+        """
+        初期化
+
+        Args:
+            cache_path: キャッシュファイルのパス
+        """
+        self.cache_path = Path(cache_path)
+        self._data: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        """キャッシュファイルを読み込む（壊れている場合は空として扱う）"""
+        if self._data is None:
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._data = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._data = {}
+        return self._data
+
+    def get(self, key: str) -> Any:
+        """キーに対応する値を取得（存在しない場合はNone）"""
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, key: str, value: Any):
+        """キーに値を設定"""
+        with self._lock:
+            self._load()[key] = value
+            self._dirty = True
+
+    def save(self):
+        """変更があればキャッシュファイルに書き込む"""
+        with self._lock:
+            if not self._dirty:
+                return
+            # 書き込み途中で中断されても壊れないよう一時ファイル経由で置き換える
+            temp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._data, f, ensure_ascii=False)
+                os.replace(temp_path, self.cache_path)
+                self._dirty = False
+            except OSError:
+                pass  # キャッシュの保存に失敗しても処理は続行
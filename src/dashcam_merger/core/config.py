@@ -3,9 +3,14 @@
 """
 
 import json
+import os
+import re
 import sys
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Pattern
+
+# 正規表現の特殊文字（これより前がファイル名の固定接頭辞になる）
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
 
 
 class Config:
@@ -25,6 +30,9 @@ class Config:
 
         self.config_path = Path(config_path)
         self.config = self._load_config()
+        self._compiled_video_pattern: Optional[Pattern[str]] = None
+        # 相対パス指定でも動画ファイルのパスが絶対パスになるよう、読み込み時に一度だけ解決する
+        self._camera_paths = {k: Path(v).resolve() for k, v in self.config["camera_paths"].items()}
 
     def _load_config(self) -> Dict[str, Any]:
         """設定ファイルを読み込む"""
@@ -41,8 +49,8 @@ class Config:
 
     @property
     def camera_paths(self) -> Dict[str, Path]:
-        """カメラごとのパスを取得"""
-        return {k: Path(v) for k, v in self.config["camera_paths"].items()}
+        """カメラごとのパス（絶対パス）を取得"""
+        return self._camera_paths
 
     @property
     def output_dir(self) -> Path:
@@ -59,6 +67,36 @@ class Config:
         """動画ファイルの正規表現パターンを取得"""
         return self.config["video_pattern"]
 
+    @property
+    def video_filename_prefix(self) -> str:
+        """
+        動画ファイル名の固定接頭辞を取得
+
+        正規表現の先頭にあるリテラル部分（例: "NO(\\d{8})..." の "NO"）を返す。
+        接頭辞を特定できない場合は空文字列を返す。
+        """
+        pattern = self.video_pattern
+        if "|" in pattern:
+            # 選択があると先頭が一意に決まらない
+            return ""
+
+        prefix = []
+        for char in pattern.lstrip("^"):
+            if char in _REGEX_SPECIAL_CHARS:
+                # 直後が0回を許す量指定子なら、直前の文字は省略可能なので除外する
+                if char in "*?{" and prefix:
+                    prefix.pop()
+                break
+            prefix.append(char)
+        return "".join(prefix)
+
+    @property
+    def compiled_video_pattern(self) -> Pattern[str]:
+        """コンパイル済みの動画ファイルパターンを取得（初回のみコンパイル）"""
+        if self._compiled_video_pattern is None:
+            self._compiled_video_pattern = re.compile(self.video_pattern)
+        return self._compiled_video_pattern
+
     @property
     def ffmpeg_copy_settings(self) -> Dict[str, str]:
         """FFmpegのストリームコピー設定を取得"""
@@ -69,10 +107,56 @@ class Config:
         """FFmpegの再エンコード設定を取得"""
         return self.config["ffmpeg_settings"]["reencode_settings"]
 
+    @property
+    def ffmpeg_hwaccel(self) -> str:
+        """
+        再エンコードに使用するハードウェアエンコーダの設定を取得
+
+        "off"（既定）はソフトウェアエンコード、"auto" は利用可能なものを自動選択、
+        それ以外はエンコーダ名（例: "h264_nvenc"）として扱う
+        """
+        return str(self.ffmpeg_reencode_settings.get("hwaccel", "off")).strip()
+
+    @property
+    def ffmpeg_movflags(self) -> str:
+        """MP4出力に付与する -movflags の値を取得（空文字列は指定なし）"""
+        return str(self.config["ffmpeg_settings"].get("movflags", "")).strip()
+
+    @property
+    def ffmpeg_threads(self) -> int:
+        """FFmpegのスレッド数を取得（0は自動）"""
+        return max(0, int(self.config["ffmpeg_settings"].get("threads", 0)))
+
+    @property
+    def performance_settings(self) -> Dict[str, Any]:
+        """パフォーマンス設定を取得"""
+        return self.config.get("performance_settings", {})
+
     @property
     def use_local_processing(self) -> bool:
         """ローカル処理を使用するかどうかを取得（NAS環境での高速化）"""
-        return self.config.get("performance_settings", {}).get("use_local_processing", True)
+        return self.performance_settings.get("use_local_processing", True)
+
+    @property
+    def nas_write_buffer_mb(self) -> int:
+        """出力先（NAS）へ直接書き込む際のメモリバッファ量（MB）を取得（0は無効）"""
+        return max(0, int(self.performance_settings.get("nas_write_buffer_mb", 0)))
+
+    @property
+    def prestage_workers(self) -> int:
+        """入力ファイルをローカルに事前コピーする際の同時コピー数を取得（0は事前コピーしない）"""
+        return max(0, int(self.performance_settings.get("prestage_workers", 0)))
+
+    @property
+    def parallel_jobs(self) -> int:
+        """同時に実行するマージ数を取得（省略時はCPUコア数の半分）"""
+        default_jobs = (os.cpu_count() or 1) // 2
+        return max(1, int(self.performance_settings.get("parallel_jobs", default_jobs)))
+
+    @property
+    def ffmpeg_threads_per_job(self) -> int:
+        """マージ1件あたりのFFmpegスレッド数を取得（0は自動）"""
+        return max(0, int(self.performance_settings.get("ffmpeg_threads_per_job", 0)))
 
     @property
     def ui_settings(self) -> Dict[str, Any]:
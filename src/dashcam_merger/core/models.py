@@ -2,35 +2,98 @@
 データモデル定義
 """
 
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass
 from pathlib import Path
+from typing import Optional, Tuple
 
 
-@dataclass
 class VideoFile:
-    """動画ファイル情報を格納するデータクラス"""
-    path: Path
-    date: str
-    time: str
-    sequence: str
-    camera_pos: str
-    filename: str
+    """
+    動画ファイル情報を格納するクラス
 
-    @property
-    def size_mb(self) -> float:
-        """ファイルサイズをMBで取得"""
-        return self.path.stat().st_size / (1024 * 1024)
+    大量のファイルを扱うため __slots__ で属性辞書を持たない不変オブジェクトとする
+    （Python 3.7 をサポートするため dataclass(slots=True) は使用しない）
+    """
 
-    @property
-    def formatted_time(self) -> str:
-        """時刻を HH:MM:SS 形式で取得"""
-        return f"{self.time[:2]}:{self.time[2:4]}:{self.time[4:6]}"
+    __slots__ = ("path", "date", "time", "sequence", "camera_pos", "filename",
+                 "size_bytes", "mtime_ns", "sort_key", "formatted_time", "formatted_date")
+
+    def __init__(self, path: Path, date: str, time: str, sequence: str, camera_pos: str, filename: str,
+                 size_bytes: Optional[int] = None, mtime_ns: Optional[int] = None):
+        """
+        初期化
+
+        未取得ならファイルサイズ・更新時刻を取得し、ソートキーと表示用の文字列を作成する
+        """
+        if size_bytes is None or mtime_ns is None:
+            stat_result = path.stat()
+            size_bytes = stat_result.st_size
+            mtime_ns = stat_result.st_mtime_ns
+
+        set_attr = object.__setattr__
+        set_attr(self, "path", path)
+        set_attr(self, "date", date)
+        set_attr(self, "time", time)
+        set_attr(self, "sequence", sequence)
+        set_attr(self, "camera_pos", camera_pos)
+        set_attr(self, "filename", filename)
+        set_attr(self, "size_bytes", size_bytes)
+        set_attr(self, "mtime_ns", mtime_ns)
+        set_attr(self, "sort_key", int(time) * 10 ** len(sequence) + int(sequence))
+        # 表示用の時刻（HH:MM:SS）・日付（YYYY-MM-DD）は参照のたびに組み立てず、ここで作成しておく
+        set_attr(self, "formatted_time", f"{time[:2]}:{time[2:4]}:{time[4:6]}")
+        set_attr(self, "formatted_date", f"{date[:4]}-{date[4:6]}-{date[6:8]}")
+
+    def _astuple(self) -> Tuple:
+        """比較・ハッシュ用に初期化引数をタプルで取得"""
+        return (self.path, self.date, self.time, self.sequence, self.camera_pos, self.filename,
+                self.size_bytes, self.mtime_ns)
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __hash__(self) -> int:
+        return hash(self._astuple())
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(path={self.path!r}, date={self.date!r}, time={self.time!r}, "
+                f"sequence={self.sequence!r}, camera_pos={self.camera_pos!r}, filename={self.filename!r}, "
+                f"size_bytes={self.size_bytes!r}, mtime_ns={self.mtime_ns!r})")
 
     @property
-    def formatted_date(self) -> str:
-        """日付を YYYY-MM-DD 形式で取得"""
-        return f"{self.date[:4]}-{self.date[4:6]}-{self.date[6:8]}"
+    def size_mb(self) -> float:
+        """ファイルサイズをMBで取得"""
+        return self.size_bytes / (1024 * 1024)
 
     def __str__(self) -> str:
         """文字列表現"""
-        return f"{self.formatted_date} {self.formatted_time} [{self.camera_pos}] {self.filename}"
\ No newline at end of file
+        return f"{self.formatted_date} {self.formatted_time} [{self.camera_pos}] {self.filename}"
+
+
+@dataclass(frozen=True)
+class ProbeInfo:
+    """ffprobeで取得した動画ファイルのストリーム情報を格納するデータクラス"""
+    video_codec: str
+    width: int
+    height: int
+    pix_fmt: str
+    time_base: str
+    frame_rate: str
+    audio_codec: str
+    sample_rate: str
+    channels: int
+    duration: float
+
+    @property
+    def stream_signature(self) -> Tuple:
+        """ストリームコピーで連結可能かを判定するための識別子を取得"""
+        return (self.video_codec, self.width, self.height, self.pix_fmt, self.time_base,
+                self.frame_rate, self.audio_codec, self.sample_rate, self.channels)
@@ -3,5 +3,6 @@ Parsers module for file parsing and analysis.
 """
 
 from .file_parser import VideoFileParser
+from .media_probe import MediaProber
 
-__all__ = ["VideoFileParser"]
\ No newline at end of file
+__all__ = ["MediaProber", "VideoFileParser"]
\ No newline at end of file
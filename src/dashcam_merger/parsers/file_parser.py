@@ -2,27 +2,36 @@
 動画ファイル解析・検索モジュール
 """
 
-import re
+import os
 from pathlib import Path
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 from typing import Dict, List, Tuple, Optional
 
+from ..core.cache import JsonCache
 from ..core.config import Config
-from ..core.models import VideoFile
+from ..core.models import ProbeInfo, VideoFile
+from .media_probe import PROBE_CACHE_FILENAME, MediaProber
 
 
 class VideoFileParser:
     """動画ファイルの解析・検索を行うクラス"""
 
-    def __init__(self, config: Config):
+    # 出力ディレクトリに保存する検索結果キャッシュのファイル名
+    SCAN_CACHE_FILENAME = ".scan_cache.json"
+
+    def __init__(self, config: Config, use_cache: bool = True):
         """
         初期化
 
         Args:
             config: 設定オブジェクト
+            use_cache: ディレクトリの更新時刻をキーにした検索結果キャッシュと、ストリーム情報の永続キャッシュを使用するかどうか
         """
         self.config = config
-        self.video_pattern = re.compile(config.video_pattern)
+        self.video_pattern = config.compiled_video_pattern
+        self.scan_cache = JsonCache(config.output_dir / self.SCAN_CACHE_FILENAME) if use_cache else None
+        self.prober = MediaProber(JsonCache(config.output_dir / PROBE_CACHE_FILENAME) if use_cache else None)
 
     def parse_filename(self, filename: str) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
         """
@@ -44,58 +53,159 @@ class VideoFileParser:
             return date_str, time_str, sequence, camera_pos
         return None, None, None, None
 
-    def find_video_files(self) -> Dict[str, Dict[str, List[VideoFile]]]:
+    def find_video_files(self) -> Dict[Tuple[str, str], List[VideoFile]]:
         """
         設定されたカメラパスから動画ファイルを取得し、日付・カメラ位置ごとにグループ化
 
         Returns:
-            {日付: {カメラ位置: [VideoFileリスト]}} の辞書
+            {(日付, カメラ位置): [VideoFileリスト]} の辞書
         """
-        videos_by_date_camera = defaultdict(lambda: defaultdict(list))
-
-        # 各カメラパスからファイルを取得
-        for camera_pos, camera_path in self.config.camera_paths.items():
-            if not camera_path.exists():
-                print(f"警告: カメラ {camera_pos} のパスが見つかりません: {camera_path}")
-                continue
-
-            for file_path in camera_path.glob("*.MP4"):
-                date_str, time_str, sequence, file_camera_pos = self.parse_filename(file_path.name)
-                if date_str and file_camera_pos == camera_pos:
-                    video_file = VideoFile(
-                        path=file_path,
-                        date=date_str,
-                        time=time_str,
-                        sequence=sequence,
-                        camera_pos=camera_pos,
-                        filename=file_path.name
-                    )
-                    videos_by_date_camera[date_str][camera_pos].append(video_file)
+        videos_by_date_camera: Dict[Tuple[str, str], List[VideoFile]] = {}
+        camera_paths = self.config.camera_paths
+
+        # NAS上のディレクトリ一覧取得は往復遅延が大きいため、カメラごとに並行して検索する
+        with ThreadPoolExecutor(max_workers=max(1, len(camera_paths))) as executor:
+            results = executor.map(self._scan_camera, camera_paths.keys(), camera_paths.values())
+
+            # 結果のマージはメインスレッドで行うためロック不要
+            for video_files in results:
+                for video_file in video_files:
+                    key = (video_file.date, video_file.camera_pos)
+                    videos_by_date_camera.setdefault(key, []).append(video_file)
+
+        if self.scan_cache is not None:
+            self.scan_cache.save()
 
         # 各日付・カメラ位置のファイルを時刻順にソート
-        for date_str in videos_by_date_camera:
-            for camera_pos in videos_by_date_camera[date_str]:
-                videos_by_date_camera[date_str][camera_pos].sort(
-                    key=lambda x: (x.time, x.sequence)
-                )
+        for video_files in videos_by_date_camera.values():
+            video_files.sort(key=attrgetter("sort_key"))
 
         return videos_by_date_camera
 
-    def filter_by_date(self, videos_by_date_camera: Dict[str, Dict[str, List[VideoFile]]],
-                      target_date: str) -> Dict[str, Dict[str, List[VideoFile]]]:
+    def _scan_camera(self, camera_pos: str, camera_path: Path) -> List[VideoFile]:
+        """
+        1つのカメラパスから動画ファイルを検索
+
+        Args:
+            camera_pos: カメラ位置
+            camera_path: カメラの動画ディレクトリ
+
+        Returns:
+            見つかったVideoFileのリスト（未ソート）
+        """
+        try:
+            dir_mtime_ns = os.stat(camera_path).st_mtime_ns
+        except FileNotFoundError:
+            print(f"警告: カメラ {camera_pos} のパスが見つかりません: {camera_path}")
+            return []
+        except OSError as e:
+            # 権限がない・ディレクトリでない・NASが未接続等の場合も、このカメラのみ動画なしとして続行する
+            print(f"警告: カメラ {camera_pos} のパスを読み込めません: {camera_path} ({e})")
+            return []
+
+        # ディレクトリの更新時刻が変わっていなければキャッシュから復元する
+        # （ファイルの追加・削除でディレクトリのmtimeが変わるため自動的に無効化される）
+        cache_key = f"{camera_pos}:{camera_path}"
+        if self.scan_cache is not None:
+            cached = self.scan_cache.get(cache_key)
+            if (cached and cached.get("mtime_ns") == dir_mtime_ns
+                    and cached.get("pattern") == self.config.video_pattern):
+                try:
+                    return [
+                        VideoFile(
+                            path=camera_path / name,
+                            date=date_str,
+                            time=time_str,
+                            sequence=sequence,
+                            camera_pos=camera_pos,
+                            filename=name,
+                            size_bytes=size_bytes,
+                            mtime_ns=mtime_ns
+                        )
+                        for name, date_str, time_str, sequence, size_bytes, mtime_ns in cached["files"]
+                    ]
+                except (TypeError, ValueError):
+                    pass  # 形式の異なる古いキャッシュは再検索する
+
+        video_files = []
+
+        # ループ内の属性参照を避けるためmatchメソッドを束縛しておく
+        match = self.video_pattern.match
+        prefix = self.config.video_filename_prefix
+
+        # os.scandirはDirEntryを返すため、Path生成とglobのパターン変換を省ける
+        try:
+            with os.scandir(camera_path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # 正規表現より安価な接頭辞チェックで無関係なファイルを先に除外する
+                    if not name.endswith(".MP4") or not name.startswith(prefix) or not entry.is_file():
+                        continue
+                    m = match(name)
+                    if not m:
+                        continue
+                    date_str, time_str, sequence, file_camera_pos = m.groups()
+                    if file_camera_pos == camera_pos:
+                        stat_result = entry.stat()
+                        video_files.append(VideoFile(
+                            path=Path(entry.path),
+                            date=date_str,
+                            time=time_str,
+                            sequence=sequence,
+                            camera_pos=camera_pos,
+                            filename=name,
+                            size_bytes=stat_result.st_size,
+                            mtime_ns=stat_result.st_mtime_ns
+                        ))
+        except FileNotFoundError:
+            print(f"警告: カメラ {camera_pos} のパスが見つかりません: {camera_path}")
+            return []
+        except OSError as e:
+            # 権限がない・ディレクトリでない・NASが未接続等の場合も、このカメラのみ動画なしとして続行する
+            print(f"警告: カメラ {camera_pos} のパスを読み込めません: {camera_path} ({e})")
+            return []
+
+        if self.scan_cache is not None:
+            self.scan_cache.set(cache_key, {
+                "mtime_ns": dir_mtime_ns,
+                "pattern": self.config.video_pattern,
+                "files": [
+                    [video.filename, video.date, video.time, video.sequence, video.size_bytes, video.mtime_ns]
+                    for video in video_files
+                ]
+            })
+
+        return video_files
+
+    def probe_all(self, video_files: List[VideoFile]) -> Dict[Path, ProbeInfo]:
+        """
+        動画ファイルのストリーム情報をまとめて取得
+
+        キャッシュに無いファイルのみffprobeを並行実行し、結果は
+        出力ディレクトリの .probe_cache.json に保存される
+
+        Args:
+            video_files: 対象の動画ファイルのリスト
+
+        Returns:
+            {ファイルパス: ストリーム情報} の辞書（取得できなかったファイルは含まない）
+        """
+        probes = self.prober.probe_files(video_files)
+        return {video.path: probe for video, probe in zip(video_files, probes) if probe is not None}
+
+    def filter_by_date(self, videos_by_date_camera: Dict[Tuple[str, str], List[VideoFile]],
+                      target_date: str) -> Dict[Tuple[str, str], List[VideoFile]]:
         """
         特定の日付でフィルタリング
 
         Args:
-            videos_by_date_camera: 日付・カメラ別の動画ファイル辞書
+            videos_by_date_camera: (日付, カメラ位置) 別の動画ファイル辞書
             target_date: 対象日付（YYYYMMDD形式）
 
         Returns:
             フィルタリング後の辞書
         """
-        if target_date in videos_by_date_camera:
-            return {target_date: videos_by_date_camera[target_date]}
-        return {}
+        return {key: video_files for key, video_files in videos_by_date_camera.items() if key[0] == target_date}
 
     def get_video_info(self, video_files: List[VideoFile]) -> Dict[str, any]:
         """
@@ -112,7 +222,7 @@ class VideoFileParser:
 
         first_file = video_files[0]
         last_file = video_files[-1]
-        total_size = sum(video.size_mb for video in video_files)
+        total_size = sum(video.size_bytes for video in video_files) / (1024 * 1024)
 
         return {
             'start_time': first_file.formatted_time,
@@ -0,0 +1,183 @@
+"""
+動画ストリーム情報解析モジュール（ffprobe）
+"""
+
+import json
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..core.cache import JsonCache
+from ..core.models import ProbeInfo, VideoFile
+
+# 出力ディレクトリに保存するストリーム情報キャッシュのファイル名
+PROBE_CACHE_FILENAME = ".probe_cache.json"
+
+# 解析に失敗したことを表すキャッシュの値（未解析のNoneと区別し、同じファイルを再解析しない）
+_PROBE_FAILED = object()
+
+
+class MediaProber:
+    """ffprobeを使用して動画ファイルのストリーム情報を取得するクラス"""
+
+    # 同時に実行するffprobeの最大数
+    MAX_WORKERS = 8
+
+    def __init__(self, cache: Optional[JsonCache] = None):
+        """
+        初期化
+
+        Args:
+            cache: 解析結果を永続化するキャッシュ（省略時はメモリ上のみ）
+        """
+        # (パス, 更新時刻, サイズ) をキーにした解析結果のキャッシュ（失敗は _PROBE_FAILED）
+        self._cache: Dict[Tuple[str, int, int], Union[ProbeInfo, object]] = {}
+        self._lock = threading.Lock()
+        self.persistent_cache = cache
+        self.available = True
+
+    def probe(self, video: VideoFile) -> Optional[ProbeInfo]:
+        """
+        動画ファイルのストリーム情報を取得
+
+        Args:
+            video: 対象の動画ファイル
+
+        Returns:
+            ストリーム情報、取得できない場合はNone
+        """
+        return self.probe_files([video])[0]
+
+    def probe_files(self, video_files: List[VideoFile]) -> List[Optional[ProbeInfo]]:
+        """
+        複数の動画ファイルのストリーム情報を取得
+
+        キャッシュに無いファイルのみffprobeを実行する（解析に失敗したファイルも再実行しない）
+
+        Args:
+            video_files: 対象の動画ファイルのリスト
+
+        Returns:
+            video_filesと同じ順序のストリーム情報のリスト（取得できない場合はNone）
+        """
+        keys = [self._cache_key(video) for video in video_files]
+        cached = [self._lookup(key) for key in keys]
+        misses = [index for index, probe in enumerate(cached) if probe is None]
+        probes: List[Optional[ProbeInfo]] = [None if probe is _PROBE_FAILED else probe for probe in cached]
+
+        if misses and self.available:
+            miss_paths = [video_files[index].path for index in misses]
+            if len(miss_paths) == 1:
+                results = [self._run_ffprobe(miss_paths[0])]
+            else:
+                # ffprobeの起動待ちを重ねるためスレッドで並行実行する
+                with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(miss_paths))) as executor:
+                    results = list(executor.map(self._run_ffprobe, miss_paths))
+
+            for index, info in zip(misses, results):
+                probes[index] = info
+                self._store(keys[index], info)
+
+            if self.persistent_cache is not None:
+                self.persistent_cache.save()
+
+        return probes
+
+    @staticmethod
+    def _cache_key(video: VideoFile) -> Tuple[str, int, int]:
+        """キャッシュのキー（パス, 更新時刻, サイズ）を作成"""
+        return (str(video.path), video.mtime_ns, video.size_bytes)
+
+    def _lookup(self, key: Tuple[str, int, int]) -> Union[ProbeInfo, object, None]:
+        """
+        メモリ上・永続キャッシュから更新時刻とサイズが一致する解析結果を取得
+
+        Returns:
+            解析結果、解析に失敗済みの場合は _PROBE_FAILED、キャッシュに無い場合はNone
+        """
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        if self.persistent_cache is None:
+            return None
+        cached = self.persistent_cache.get(key[0])
+        if not cached or cached.get("mtime_ns") != key[1] or cached.get("size") != key[2]:
+            return None
+        try:
+            info = ProbeInfo(**cached["info"])
+        except (KeyError, TypeError):
+            return None
+
+        with self._lock:
+            self._cache[key] = info
+        return info
+
+    def _store(self, key: Tuple[str, int, int], info: Optional[ProbeInfo]):
+        """解析結果をキャッシュに保存（失敗した結果はメモリ上にのみ記録し、永続化しない）"""
+        with self._lock:
+            self._cache[key] = _PROBE_FAILED if info is None else info
+        if info is not None and self.persistent_cache is not None:
+            self.persistent_cache.set(key[0], {"mtime_ns": key[1], "size": key[2], "info": asdict(info)})
+
+    def _run_ffprobe(self, path: Path) -> Optional[ProbeInfo]:
+        """
+        ffprobeを実行してストリーム情報を解析
+
+        Args:
+            path: 動画ファイルのパス
+
+        Returns:
+            ストリーム情報、失敗時はNone
+        """
+        cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-show_format',
+            '-show_streams',
+            '-of', 'json',
+            str(path)
+        ]
+
+        try:
+            # JSONはバイト列のまま解析し、使わない標準エラー出力は読み捨てる
+            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+            data = json.loads(result.stdout)
+        except FileNotFoundError:
+            # ffprobeが無い環境では以降の解析を行わない
+            self.available = False
+            return None
+        except (subprocess.CalledProcessError, ValueError):
+            return None
+
+        return self._parse_probe_data(data)
+
+    @staticmethod
+    def _parse_probe_data(data: dict) -> Optional[ProbeInfo]:
+        """ffprobeのJSON出力からストリーム情報を作成"""
+        streams = data.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        if video is None:
+            return None
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+        try:
+            duration = float(data.get("format", {}).get("duration") or 0.0)
+        except ValueError:
+            duration = 0.0
+
+        return ProbeInfo(
+            video_codec=video.get("codec_name", ""),
+            width=int(video.get("width", 0)),
+            height=int(video.get("height", 0)),
+            pix_fmt=video.get("pix_fmt", ""),
+            time_base=video.get("time_base", ""),
+            frame_rate=video.get("r_frame_rate", ""),
+            audio_codec=audio.get("codec_name", ""),
+            sample_rate=audio.get("sample_rate", ""),
+            channels=int(audio.get("channels", 0)),
+            duration=duration
+        )
@@ -2,30 +2,218 @@
 動画マージ処理モジュール
 """
 
+import io
+import os
+import queue
+import re
 import subprocess
+import sys
 import tempfile
 import shutil
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import groupby
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 
+from ..core.cache import JsonCache
 from ..core.config import Config
-from ..core.models import VideoFile
+from ..core.models import ProbeInfo, VideoFile
+from ..parsers.media_probe import PROBE_CACHE_FILENAME, MediaProber
 from ..ui.progress import ProgressTracker
 
+# FFmpegの -progress 出力（key=value形式）の1行
+_PROGRESS_LINE = re.compile(r"^(\w+)=(.*)$")
+
+
+def _parse_out_time(progress: Dict[str, str]) -> float:
+    """進捗ブロックから出力済みの再生時間（秒）を取得"""
+    try:
+        return int(progress.get("out_time_us", "0")) / 1_000_000
+    except ValueError:
+        return 0.0  # 開始直後は "N/A" になる
+
+
+def _parse_speed(progress: Dict[str, str]) -> Optional[float]:
+    """進捗ブロックから処理速度（再生速度比）を取得"""
+    try:
+        return float(progress.get("speed", "").rstrip("x"))
+    except ValueError:
+        return None
+
+
+class _BufferedOutputWriter:
+    """
+    FFmpegの標準出力から動画データを読み取り、メモリ上のキューを介して別スレッドでファイルに書き込む
+
+    NASの書き込み応答が一時的に遅れてもFFmpegの出力パイプが詰まらないよう、
+    最大 buffer_mb MB までをメモリに溜めて書き込みの遅延を吸収する
+    """
+
+    # パイプから読み取る単位とファイルに書き込む単位
+    READ_CHUNK_SIZE = 1024 * 1024
+    WRITE_CHUNK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, source, output_file: Path, buffer_mb: int):
+        self._source = source
+        self._output_file = output_file
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(
+            maxsize=max(1, buffer_mb * 1024 * 1024 // self.READ_CHUNK_SIZE))
+        self.error: Optional[OSError] = None
+        self._threads = [threading.Thread(target=self._read_loop, daemon=True),
+                         threading.Thread(target=self._write_loop, daemon=True)]
+
+    def start(self):
+        """読み取り・書き込みスレッドを開始"""
+        for thread in self._threads:
+            thread.start()
+
+    def join(self):
+        """すべてのデータを書き込み終えるまで待機"""
+        for thread in self._threads:
+            thread.join()
+
+    def _read_loop(self):
+        try:
+            while True:
+                chunk = self._source.read(self.READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                self._queue.put(chunk)
+        finally:
+            self._source.close()
+            self._queue.put(None)
+
+    def _write_loop(self):
+        pending = bytearray()
+        offset = 0
+        try:
+            output = open(self._output_file, 'wb')
+        except OSError as e:
+            self.error = e
+            output = None
+
+        while True:
+            chunk = self._queue.get()
+            if chunk is not None:
+                pending += chunk
+            if output is not None and pending and (chunk is None or len(pending) >= self.WRITE_CHUNK_SIZE):
+                try:
+                    output.write(pending)
+                    output.flush()
+                    # 書き込み済みの範囲はページキャッシュに残さない
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(output.fileno(), offset, len(pending), os.POSIX_FADV_DONTNEED)
+                    offset += len(pending)
+                except OSError as e:
+                    # 書き込みに失敗してもFFmpegが止まらないよう、残りは読み捨てる
+                    self.error = e
+                    self._close(output)
+                    output = None
+            if output is None or len(pending) >= self.WRITE_CHUNK_SIZE or chunk is None:
+                pending = bytearray()
+            if chunk is None:
+                break
+
+        if output is not None:
+            self._close(output)
+
+    def _close(self, output):
+        """
+        出力ファイルを閉じる
+
+        閉じる際のバッファの書き出しでも失敗しうる（ENOSPC・EIO等）。例外でこのスレッドが終了すると
+        キューを読み出す側がいなくなり、読み取りスレッドとFFmpegが書き込み待ちで止まるため、エラーとして記録するのみとする
+        """
+        try:
+            output.close()
+        except OSError as e:
+            if self.error is None:
+                self.error = e
+
 
 class VideoMerger:
     """FFmpegを使用した動画マージ処理を行うクラス"""
 
-    def __init__(self, config: Config):
+    # エラー報告用に保持するFFmpeg出力の行数
+    STDERR_TAIL_LINES = 64
+
+    # ストリームコピーを打ち切る処理速度（再生速度比）と、判定を始めるまでの猶予秒数
+    COPY_ABORT_SPEED = 0.5
+    COPY_ABORT_GRACE_SECONDS = 5.0
+
+    # 入力パケットキューの長さ（-thread_queue_size）
+    INPUT_THREAD_QUEUE_SIZE = 1024
+
+    # FFmpegの進捗をプログレストラッカーに反映する最短間隔（秒）
+    TRACKER_UPDATE_INTERVAL = 0.1
+
+    # 区間ごとにマージする際の中間ファイルの形式と、そのまま格納できる音声コーデック（空は音声なし）
+    RUN_INTERMEDIATE_FORMAT = "mpegts"
+    RUN_AUDIO_CODECS = ("", "aac", "mp3", "ac3")
+
+    # 再エンコードに使うソフトウェアエンコーダと、出力されるコーデック名（ffprobeのcodec_name）
+    ENCODER_CODECS = {"libx264": "h264", "libx265": "hevc"}
+
+    # hwaccel が "auto" の場合に優先して使うハードウェアエンコーダ
+    HW_ENCODER_PREFERENCE = ("h264_nvenc", "h264_qsv", "h264_videotoolbox", "h264_vaapi")
+
+    # ハードウェアエンコーダごとの入力側の -hwaccel / -hwaccel_output_format の値
+    HW_DECODE_ARGS = {
+        "h264_nvenc": ("cuda", "cuda"),
+        "hevc_nvenc": ("cuda", "cuda"),
+        "h264_qsv": ("qsv", "qsv"),
+        "hevc_qsv": ("qsv", "qsv"),
+        "h264_videotoolbox": ("videotoolbox", None),
+        "hevc_videotoolbox": ("videotoolbox", None),
+        "h264_vaapi": ("vaapi", "vaapi"),
+        "hevc_vaapi": ("vaapi", "vaapi"),
+    }
+
+    def __init__(self, config: Config, prober: Optional[MediaProber] = None):
         """
         初期化
 
         Args:
             config: 設定オブジェクト
+            prober: ストリーム情報の取得に使うMediaProber（省略時は新規作成）
         """
         self.config = config
         self.progress_tracker: Optional[ProgressTracker] = None
+        self.prober = prober or MediaProber(JsonCache(config.output_dir / PROBE_CACHE_FILENAME))
+        # マージごとに参照する設定は初期化時に取り出しておく
+        self._copy_settings = config.ffmpeg_copy_settings
+        self._reencode_settings = config.ffmpeg_reencode_settings
+        self._camera_names: Dict[str, str] = {}
+        # 使用するハードウェアエンコーダ（未判定はNone、使用しない場合は空文字列）
+        self._hw_encoder: Optional[str] = None
+        self._hw_encoder_lock = threading.Lock()
+        # merge_allで同時に実行しているマージ数（FFmpegのスレッド数の自動割り当てに使用）
+        self._concurrent_jobs = 1
+        # merge_allのワーカースレッドごとのログの出力先（未設定のスレッドは標準出力に書き込む）
+        self._job_log = threading.local()
+
+    def _print(self, *values, **kwargs):
+        """
+        マージ処理のログを出力
+
+        merge_allの並列実行中はジョブごとのログに書き込み、完了時にまとめて表示する。
+        sys.stdout は置き換えないため、他のコンポーネントの出力には影響しない
+        """
+        print(*values, file=self._log_stream(), **kwargs)
+
+    def _log_stream(self):
+        """現在のスレッドのログの出力先を取得"""
+        return getattr(self._job_log, "stream", None) or sys.stdout
+
+    def _camera_name(self, camera_pos: str) -> str:
+        """カメラ位置から表示名を取得（初回のみ設定を参照）"""
+        camera_name = self._camera_names.get(camera_pos)
+        if camera_name is None:
+            camera_name = self._camera_names[camera_pos] = self.config.get_camera_name(camera_pos)
+        return camera_name
 
     def create_file_list(self, video_files: List[VideoFile], date_str: str, camera_pos: str, use_local_temp: bool = True) -> Path:
         """
@@ -48,14 +236,283 @@ class VideoMerger:
             # 従来通り出力ディレクトリに作成
             list_file_path = self.config.output_dir / f"filelist_{date_str}_{camera_pos}.txt"
 
-        with open(list_file_path, 'w', encoding='utf-8') as f:
-            for video in video_files:
-                # FFmpegのconcatフィルター用のフォーマット
-                f.write(f"file '{video.path.absolute()}'\n")
-
+        # 検索時に絶対パスになっているため、ここでのパス解決は不要
+        list_file_path.write_bytes(self._concat_listing([video.path for video in video_files]))
         return list_file_path
 
-    def merge_videos(self, video_files: List[VideoFile], date_str: str, camera_pos: str, use_local_processing: bool = True) -> bool:
+    @staticmethod
+    def _concat_listing(paths: List[Path]) -> bytes:
+        """
+        concatデマルチプレクサ用のファイルリストの内容を作成
+
+        テキストのエンコード処理を挟まず、パスはファイルシステムのバイト列のまま連結する。
+        標準入力（pipe:0）から読み込んだリストの相対URLは "pipe:" を基準に解決されるため、
+        各パスには "file:" を付けてローカルファイルとして開かせる
+
+        Args:
+            paths: 連結するファイルの絶対パスのリスト
+
+        Returns:
+            ファイルリストのバイト列
+        """
+        fsencode = os.fsencode
+        # パス中の ' は concat のクォート規則に従い '\'' としてエスケープする
+        return b"".join([b"file 'file:" + fsencode(path).replace(b"'", b"'\\''") + b"'\n" for path in paths])
+
+    def probe_segments(self, video_files: List[VideoFile]) -> List[Optional[ProbeInfo]]:
+        """
+        各動画ファイルのストリーム情報を取得
+
+        Args:
+            video_files: 対象の動画ファイルのリスト
+
+        Returns:
+            video_filesと同じ順序のストリーム情報のリスト（取得失敗はNone）
+        """
+        return self.prober.probe_files(video_files)
+
+    def _group_copyable_runs(self, video_files: List[VideoFile]) -> List[List[VideoFile]]:
+        """
+        ストリーム設定が同じ連続したファイルごとにグループ化
+
+        区間が1つであれば全体をストリームコピーで連結できる。
+        ストリーム情報が一致しないことが分かっている場合に、
+        失敗するストリームコピーを実行する無駄を省くために使用する
+
+        Args:
+            video_files: 時系列順の動画ファイルのリスト
+
+        Returns:
+            ストリームコピーで連結可能な区間のリスト。
+            ストリーム情報を取得できないファイルがある場合は全体を1区間とする
+        """
+        probes = self.probe_segments(video_files)
+        if any(probe is None for probe in probes):
+            return [video_files]
+
+        # 識別子の比較とグループ化はgroupbyに任せ、ファイルごとのPython側の分岐を省く
+        return [
+            [video for video, _ in run]
+            for _, run in groupby(zip(video_files, probes), key=lambda pair: pair[1].stream_signature)
+        ]
+
+    def _prestage_inputs(self, video_files: List[VideoFile]) -> Dict[Path, Path]:
+        """
+        入力ファイルをローカル一時ディレクトリに並行してコピー
+
+        NASからの読み込みをFFmpegの処理と交互に行わず、複数ファイルを同時に読み込んで待ち時間を重ねる。
+        FFmpegはファイルリストを最初に読み込むため、全ファイルのコピー完了後にマージを開始する
+
+        Args:
+            video_files: 対象の動画ファイルのリスト
+
+        Returns:
+            元ファイルのパスからローカルのコピーへの対応（無効時・失敗時は空）
+        """
+        workers = self.config.prestage_workers
+        if workers <= 0:
+            return {}
+
+        staging_dir = Path(tempfile.mkdtemp(prefix="dashcam_stage_"))
+        staged_paths = {video.path: staging_dir / video.filename for video in video_files}
+        try:
+            with ThreadPoolExecutor(max_workers=min(workers, len(staged_paths))) as executor:
+                list(executor.map(shutil.copyfile, staged_paths.keys(), staged_paths.values()))
+        except OSError as e:
+            self._print(f"事前コピーに失敗したため、元のファイルから読み込みます: {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return {}
+        return staged_paths
+
+    def _cleanup_staged_inputs(self, staged_paths: Dict[Path, Path]):
+        """事前コピーしたファイルを一時ディレクトリごと削除"""
+        if staged_paths:
+            shutil.rmtree(next(iter(staged_paths.values())).parent, ignore_errors=True)
+
+    def _reencode_audio_codec(self, video_files: List[VideoFile]) -> str:
+        """
+        再エンコード時に使用する音声コーデックを取得
+
+        全ファイルの音声が設定と同じコーデックで、サンプルレート・チャンネル数も揃っている場合は
+        音声を再エンコードせずにコピーする（ドライブレコーダーのAAC音声では通常こちらになる）
+
+        Args:
+            video_files: 対象の動画ファイルのリスト
+
+        Returns:
+            -c:a に指定するコーデック名
+        """
+        audio_codec = self._reencode_settings["audio_codec"]
+        probes = self.probe_segments(video_files)
+        if any(probe is None for probe in probes):
+            return audio_codec
+
+        audio_streams = {(probe.audio_codec, probe.sample_rate, probe.channels) for probe in probes}
+        if len(audio_streams) == 1 and next(iter(audio_streams))[0] == audio_codec:
+            return "copy"
+        return audio_codec
+
+    def _dominant_probe(self, runs: List[List[VideoFile]]) -> Optional[ProbeInfo]:
+        """
+        区間ごとのマージで基準にするストリーム設定を取得
+
+        再生時間の合計が最も長いストリーム設定を基準とする。設定のエンコーダで同じコーデックを出力できない場合や、
+        音声の有無が区間によって異なる場合は、区間ごとに揃えられないためNoneを返す
+
+        Args:
+            runs: ストリームコピーで連結可能な区間のリスト（全ファイルのストリーム情報を取得済み）
+
+        Returns:
+            基準のストリーム情報、区間ごとにマージできない場合はNone
+        """
+        durations: Dict[Tuple, float] = {}
+        run_probes: Dict[Tuple, ProbeInfo] = {}
+        for run in runs:
+            probes = self.probe_segments(run)
+            signature = probes[0].stream_signature
+            run_probes.setdefault(signature, probes[0])
+            durations[signature] = durations.get(signature, 0.0) + sum(probe.duration for probe in probes)
+
+        target = run_probes[max(durations, key=durations.__getitem__)]
+        if self.ENCODER_CODECS.get(self._reencode_settings["video_codec"]) != target.video_codec:
+            return None
+        if target.audio_codec not in self.RUN_AUDIO_CODECS:
+            return None
+        if any(bool(probe.audio_codec) != bool(target.audio_codec) for probe in run_probes.values()):
+            return None
+        return target
+
+    def _merge_runs(self, runs: List[List[VideoFile]], staged_paths: Dict[Path, Path], output_file: Path,
+                    on_progress: Optional[Callable[[Dict[str, str]], bool]] = None) -> bool:
+        """
+        区間ごとにマージしてから、中間ファイルをストリームコピーで連結
+
+        基準と同じストリーム設定の区間はストリームコピーし、それ以外の区間（およびコピーに失敗した区間）のみ
+        基準の解像度・フレームレート・音声形式に合わせて再エンコードする。
+        一部の区間の不整合で1日分すべてを再エンコードすることを避けられる。
+        中間ファイルはキーフレームごとにSPS/PPSを持つMPEG-TSとし、エンコーダの異なる区間もそのまま連結できるようにする
+
+        Args:
+            runs: ストリームコピーで連結可能な区間のリスト
+            staged_paths: 元ファイルのパスからローカルに事前コピーしたファイルのパスへの対応
+            output_file: 出力ファイルのパス
+            on_progress: 進捗ブロックを受け取るコールバック（処理位置は入力全体の位置に換算して渡す）
+
+        Returns:
+            成功時True、区間ごとにマージできない場合・失敗時はFalse
+        """
+        target = self._dominant_probe(runs)
+        if target is None:
+            return False
+
+        run_dir = Path(tempfile.mkdtemp(prefix="dashcam_runs_"))
+        part_files: List[Path] = []
+        offset = 0.0
+        try:
+            for index, run in enumerate(runs):
+                part_file = run_dir / f"part_{index}.ts"
+                part_files.append(part_file)
+                probes = self.probe_segments(run)
+                input_data = self._concat_listing([staged_paths.get(video.path, video.path) for video in run])
+                run_progress = self._offset_progress(on_progress, offset)
+                offset += sum(probe.duration for probe in probes)
+
+                if probes[0].stream_signature == target.stream_signature:
+                    try:
+                        self._run_ffmpeg(self._concat_copy_cmd(part_file, '-f', self.RUN_INTERMEDIATE_FORMAT),
+                                         run_progress, input_data=input_data)
+                        continue
+                    except subprocess.CalledProcessError:
+                        self._cleanup_temp_file(part_file)
+                self._run_ffmpeg(self._conform_cmd(part_file, target), run_progress, input_data=input_data)
+
+            # 中間ファイルを連結
+            self._run_ffmpeg(self._concat_copy_cmd(output_file), input_data=self._concat_listing(part_files),
+                             output_file=output_file)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    def _concat_copy_cmd(self, output_file: Path, *output_args: str) -> List[str]:
+        """
+        標準入力のファイルリストをストリームコピーで連結するFFmpegコマンドを作成
+
+        Args:
+            output_file: 出力ファイルのパス
+            output_args: 出力ファイルの前に追加する引数（出力形式の指定等）
+
+        Returns:
+            コマンドの引数リスト
+        """
+        return [
+            'ffmpeg',
+            *self._thread_args(),
+            '-probesize', '32M',
+            '-analyzeduration', '10M',
+            *self._concat_input_args(),
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            '-fflags', '+genpts',
+            *output_args,
+            '-y',
+            str(output_file)
+        ]
+
+    def _conform_cmd(self, output_file: Path, target: ProbeInfo) -> List[str]:
+        """
+        区間を基準のストリーム設定に合わせて再エンコードするFFmpegコマンドを作成
+
+        Args:
+            output_file: 出力ファイル（中間ファイル）のパス
+            target: 基準のストリーム情報
+
+        Returns:
+            コマンドの引数リスト
+        """
+        reencode_settings = self._reencode_settings
+        if target.audio_codec:
+            audio_args = ['-c:a', target.audio_codec, '-ar', target.sample_rate]
+            if target.channels > 0:
+                audio_args += ['-ac', str(target.channels)]
+        else:
+            audio_args = ['-an']
+
+        return [
+            'ffmpeg',
+            *self._thread_args(),
+            '-probesize', '32M',
+            '-analyzeduration', '10M',
+            *self._concat_input_args(),
+            '-vf', f"scale={target.width}:{target.height},format={target.pix_fmt}",
+            '-r', target.frame_rate,
+            '-c:v', reencode_settings["video_codec"],
+            '-preset', reencode_settings["preset"],
+            '-crf', reencode_settings["crf"],
+            *audio_args,
+            '-threads', str(self._ffmpeg_threads()),
+            *self._x264_thread_args(reencode_settings),
+            '-f', self.RUN_INTERMEDIATE_FORMAT,
+            '-y',
+            str(output_file)
+        ]
+
+    @staticmethod
+    def _offset_progress(on_progress: Optional[Callable[[Dict[str, str]], bool]],
+                         offset: float) -> Optional[Callable[[Dict[str, str]], bool]]:
+        """区間の処理位置に先行する区間の再生時間（秒）を加えて渡すコールバックを作成"""
+        if on_progress is None:
+            return None
+        offset_us = int(offset * 1_000_000)
+
+        def shifted(progress: Dict[str, str]) -> bool:
+            return on_progress({**progress, "out_time_us": str(int(_parse_out_time(progress) * 1_000_000) + offset_us)})
+
+        return shifted
+
+    def merge_videos(self, video_files: List[VideoFile], date_str: str, camera_pos: str, use_local_processing: bool = True,
+                     progress_key: Optional[str] = None) -> bool:
         """
         指定された動画ファイルをマージ
 
@@ -64,57 +521,186 @@ class VideoMerger:
             date_str: 日付文字列
             camera_pos: カメラ位置
             use_local_processing: ローカル処理を使用するかどうか（NAS環境での高速化）
+            progress_key: FFmpegの進捗を反映するプログレストラッカー上のキー（省略時は進捗をログに表示）
 
         Returns:
             マージ成功時True、失敗時False
         """
         if not video_files:
-            print(f"日付 {date_str} カメラ {camera_pos} の動画ファイルが見つかりませんでした")
+            self._print(f"日付 {date_str} カメラ {camera_pos} の動画ファイルが見つかりませんでした")
             return False
 
-        camera_name = self.config.get_camera_name(camera_pos)
-        print(f"日付 {date_str} {camera_name}カメラ: {len(video_files)} 個のファイルをマージ中...")
-
-        # ファイルリストを作成（ローカル一時ディレクトリ使用）
-        list_file = self.create_file_list(video_files, date_str, camera_pos, use_local_temp=use_local_processing)
+        camera_name = self._camera_name(camera_pos)
+        self._print(f"日付 {date_str} {camera_name}カメラ: {len(video_files)} 個のファイルをマージ中...")
 
         # 出力ファイル名を生成
-        formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        formatted_date = video_files[0].formatted_date
         final_output_file = self.config.output_dir / f"merged_{formatted_date}_{camera_pos}.mp4"
 
-        # ローカル処理の場合、一時出力ファイルを使用
-        if use_local_processing:
-            temp_dir = Path(tempfile.gettempdir())
-            temp_output_file = temp_dir / f"merged_{formatted_date}_{camera_pos}.mp4"
-        else:
-            temp_output_file = final_output_file
+        # 1ファイルのみの場合はマージ不要のため、FFmpegを起動せずにそのまま出力する
+        if len(video_files) == 1:
+            success = self._link_or_copy(video_files[0].path, final_output_file)
+            if success:
+                self._print(f"マージ完了: {final_output_file}")
+            return success
+
+        # 設定時はNAS上のファイルをローカルに並行してコピーしてから読み込む
+        if self.config.prestage_workers > 0:
+            self._print(f"ローカルに事前コピー中: {len(video_files)} ファイル")
+        staged_paths = self._prestage_inputs(video_files)
+
+        # ファイルリストはディスクに書かず、FFmpegの標準入力に渡す
+        input_paths = [staged_paths.get(video.path, video.path) for video in video_files]
+
+        # ストリームコピーは出力先に直接書き込み、再エンコードのみローカルで処理してから移動する。
+        # どちらも出力先のファイルを直接上書きせず、成功した場合のみ置き換えて既存の出力を残す
+        partial_output_file = self._partial_output_file(final_output_file)
+        temp_output_file = self._reencode_output_file(final_output_file, use_local_processing)
 
         success = False
+        output_file = partial_output_file
 
-        # ストリームコピーを試行
-        if self._try_stream_copy_optimized(list_file, temp_output_file):
-            success = True
+        # 進捗表示用に入力全体の再生時間を求める（解析結果はキャッシュ済み）
+        total_duration = sum(probe.duration for probe in self.probe_segments(video_files) if probe)
+
+        audio_codec = self._reencode_audio_codec(video_files)
+
+        def progress_callback(status: str, abort_if_slow: bool = False) -> Callable[[Dict[str, str]], bool]:
+            if progress_key is not None and self.progress_tracker is not None:
+                return self._make_tracker_callback(progress_key, f"{date_str} {camera_name}カメラ {status}",
+                                                   str(final_output_file), total_duration, abort_if_slow)
+            return self._make_progress_callback(total_duration, abort_if_slow)
+
+        # ストリーム設定が途中で変わることが分かっている場合、全体のストリームコピーは試行しない
+        runs = self._group_copyable_runs(video_files)
+        if len(runs) == 1:
+            # ストリームコピーを試行
+            success = self._try_stream_copy_optimized(input_paths, partial_output_file,
+                                                      progress_callback("ストリームコピー処理中", abort_if_slow=True))
         else:
-            # 再エンコードを試行
-            success = self._try_reencode_optimized(list_file, temp_output_file)
+            # 設定の異なる区間のみ再エンコードし、残りはストリームコピーする
+            self._print(f"ストリーム設定が異なる {len(runs)} 区間に分けてマージします")
+            success = self._merge_runs(runs, staged_paths, partial_output_file,
+                                       progress_callback(f"{len(runs)} 区間に分けてマージ中"))
+            if not success:
+                self._print("区間ごとのマージに失敗。全体を再エンコードします...")
+
+        if not success:
+            # 失敗したマージの出力を残さないよう削除
+            self._cleanup_temp_file(partial_output_file)
+            output_file = temp_output_file
+            success = self._try_reencode_optimized(input_paths, temp_output_file,
+                                                   progress_callback("再エンコード処理中"), audio_codec)
 
-        # ローカル処理の場合、最終出力先に移動
-        if success and use_local_processing and temp_output_file != final_output_file:
+        # 最終出力先に置き換え（ローカルで再エンコードした場合はNASに移動）
+        if success:
             try:
-                print(f"処理完了ファイルをNASに移動中: {final_output_file}")
-                shutil.move(str(temp_output_file), str(final_output_file))
-                print(f"マージ完了: {final_output_file}")
+                if output_file.parent != final_output_file.parent:
+                    self._print(f"処理完了ファイルをNASに移動中: {final_output_file}")
+                self._move_to_output(output_file, final_output_file)
+                self._print(f"マージ完了: {final_output_file}")
             except Exception as e:
-                print(f"ファイル移動エラー: {e}")
+                self._print(f"ファイル移動エラー: {e}")
                 success = False
 
         # 一時ファイルをクリーンアップ
-        self._cleanup_temp_file(list_file)
-        if use_local_processing and temp_output_file.exists() and temp_output_file != final_output_file:
-            self._cleanup_temp_file(temp_output_file)
+        for temp_file in (partial_output_file, temp_output_file):
+            if temp_file.exists():
+                self._cleanup_temp_file(temp_file)
+        self._cleanup_staged_inputs(staged_paths)
 
         return success
 
+    def merge_all(self, jobs: List[Tuple[str, str, List[VideoFile]]],
+                  progress_tracker: Optional[ProgressTracker] = None) -> int:
+        """
+        日付・カメラ別のマージをスレッドプールで並列実行
+
+        処理の大半はFFmpegのサブプロセス待ちのため、プロセスではなくスレッドで並列化し、
+        ストリーム情報のキャッシュも共有する。各ジョブのログは完了時にまとめて表示する。
+        カメラごとに入力ファイルは別のため、同じ日付の複数カメラを1つのFFmpegにまとめても
+        NASからの読み込み量は減らず、個別のジョブとして並列実行する
+
+        Args:
+            jobs: (日付, カメラ位置, VideoFileリスト) のリスト
+            progress_tracker: プログレストラッカー（指定時はログの代わりに進捗を表示）
+
+        Returns:
+            成功したマージ数
+        """
+        if not jobs:
+            return 0
+
+        def job_key(date_str: str, camera_pos: str) -> str:
+            return f"{date_str}_{camera_pos}"
+
+        def job_size_mb(video_files: List[VideoFile]) -> float:
+            return sum(video.size_bytes for video in video_files) / (1024 * 1024)
+
+        def run_job(date_str: str, camera_pos: str, video_files: List[VideoFile]) -> Tuple[bool, str]:
+            # このジョブのログは専用のバッファに書き込み、完了時にまとめて表示する
+            log = self._job_log.stream = io.StringIO()
+            try:
+                if progress_tracker is not None:
+                    # 進捗表示には開始したジョブから追加する
+                    camera_name = self._camera_name(camera_pos)
+                    key = job_key(date_str, camera_pos)
+                    progress_tracker.add_camera(key, f"{date_str} {camera_name}",
+                                                len(video_files), job_size_mb(video_files))
+                    progress_tracker.update_camera(key, 0, str(video_files[0].path),
+                                                   0.0, f"{date_str} {camera_name}カメラ 処理中")
+                success = self.merge_videos(video_files, date_str, camera_pos, self.config.use_local_processing,
+                                            job_key(date_str, camera_pos) if progress_tracker is not None else None)
+            except Exception as e:
+                self._print(f"日付 {date_str} カメラ {camera_pos}: エラー: {e}")
+                success = False
+            finally:
+                del self._job_log.stream
+            return success, log.getvalue()
+
+        if progress_tracker is not None:
+            # 各ジョブのFFmpegの進捗はキー（日付_カメラ位置）ごとにトラッカーへ反映する
+            self.progress_tracker = progress_tracker
+            progress_tracker.start_display()
+
+        success_count = 0
+        max_workers = max(1, min(self.config.parallel_jobs, len(jobs)))
+        self._concurrent_jobs = max_workers
+        # 進捗表示中は各ジョブのログを表示しないため、失敗したジョブのログのみ残して表示終了後に出力する
+        failed_logs: List[str] = []
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(run_job, *job): job for job in jobs}
+                for future in as_completed(futures):
+                    date_str, camera_pos, video_files = futures[future]
+                    success, log = future.result()
+                    if success:
+                        success_count += 1
+
+                    if progress_tracker is not None:
+                        # ProgressTrackerは進捗を丸ごと差し替えるため、他スレッドからの更新と競合しない
+                        camera_name = self._camera_name(camera_pos)
+                        progress_tracker.update_camera(
+                            job_key(date_str, camera_pos), len(video_files) if success else 0, "",
+                            job_size_mb(video_files) if success else 0.0,
+                            f"{date_str} {camera_name}カメラ {'完了' if success else '失敗'}"
+                        )
+                        if not success:
+                            failed_logs.append(log)
+                    else:
+                        print(log, end="")
+        finally:
+            self._concurrent_jobs = 1
+            if progress_tracker is not None:
+                progress_tracker.stop_display()
+                progress_tracker.print_final_summary()
+                if failed_logs:
+                    print("\n失敗したマージのログ:")
+                    for log in failed_logs:
+                        print(log, end="")
+
+        return success_count
+
     def merge_videos_with_progress(self, video_files: List[VideoFile], date_str: str, camera_pos: str,
                                  progress_tracker: ProgressTracker, use_local_processing: bool = True) -> bool:
         """
@@ -133,13 +719,13 @@ class VideoMerger:
         if not video_files:
             return False
 
-        camera_name = self.config.get_camera_name(camera_pos)
+        camera_name = self._camera_name(camera_pos)
 
         # プログレストラッカーを設定
         self.progress_tracker = progress_tracker
 
         # ファイルサイズを計算
-        total_size_mb = sum(video.path.stat().st_size for video in video_files) / (1024 * 1024)
+        total_size_mb = sum(video.size_bytes for video in video_files) / (1024 * 1024)
 
         # カメラをプログレストラッカーに追加
         progress_tracker.add_camera(camera_pos, camera_name, len(video_files), total_size_mb)
@@ -147,77 +733,116 @@ class VideoMerger:
         # 処理開始の更新
         progress_tracker.update_camera(camera_pos, 0, "", 0.0, f"{camera_name}カメラ処理開始")
 
-        # ファイルリストを作成
-        list_file = self.create_file_list(video_files, date_str, camera_pos, use_local_temp=use_local_processing)
-
         # 出力ファイル名を生成
-        formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+        formatted_date = video_files[0].formatted_date
         final_output_file = self.config.output_dir / f"merged_{formatted_date}_{camera_pos}.mp4"
 
-        # ローカル処理の場合、一時出力ファイルを使用
-        if use_local_processing:
-            temp_dir = Path(tempfile.gettempdir())
-            temp_output_file = temp_dir / f"merged_{formatted_date}_{camera_pos}.mp4"
-        else:
-            temp_output_file = final_output_file
+        # 1ファイルのみの場合はマージ不要のため、FFmpegを起動せずにそのまま出力する
+        if len(video_files) == 1:
+            success = self._link_or_copy(video_files[0].path, final_output_file)
+            if success:
+                progress_tracker.update_camera(camera_pos, 1, str(final_output_file),
+                                             total_size_mb, f"{camera_name}カメラ 完了")
+            else:
+                progress_tracker.update_camera(camera_pos, 0, "", 0.0, f"{camera_name}カメラ コピーエラー")
+            return success
+
+        # 設定時はNAS上のファイルをローカルに並行してコピーしてから読み込む
+        if self.config.prestage_workers > 0:
+            progress_tracker.update_camera(camera_pos, 0, "", 0.0, f"{camera_name}カメラ ローカルにコピー中")
+        staged_paths = self._prestage_inputs(video_files)
+
+        # ファイルリストはディスクに書かず、FFmpegの標準入力に渡す
+        input_paths = [staged_paths.get(video.path, video.path) for video in video_files]
+
+        # ストリームコピーは出力先に直接書き込み、再エンコードのみローカルで処理してから移動する。
+        # どちらも出力先のファイルを直接上書きせず、成功した場合のみ置き換えて既存の出力を残す
+        partial_output_file = self._partial_output_file(final_output_file)
+        temp_output_file = self._reencode_output_file(final_output_file, use_local_processing)
+
+        # 進捗の割合を求めるため入力全体の再生時間を求める（解析結果はキャッシュ済み）
+        total_duration = sum(probe.duration for probe in self.probe_segments(video_files) if probe)
+
+        def try_copy(copy_inputs: List[Path], copy_output: Path) -> bool:
+            return self._try_stream_copy_optimized_with_progress(copy_inputs, copy_output,
+                                                                 camera_pos, camera_name, total_duration)
+
+        audio_codec = self._reencode_audio_codec(video_files)
+
+        def try_reencode(reencode_inputs: List[Path], reencode_output: Path) -> bool:
+            return self._try_reencode_optimized_with_progress(reencode_inputs, reencode_output,
+                                                              camera_pos, camera_name, audio_codec,
+                                                              total_duration)
 
         success = False
 
         try:
-            # ストリームコピーを試行
-            progress_tracker.update_camera(camera_pos, 1, str(video_files[0].path), 0.0,
-                                         f"{camera_name}カメラ ストリームコピー中")
+            output_file = partial_output_file
 
-            if self._try_stream_copy_optimized_with_progress(list_file, temp_output_file,
-                                                           camera_pos, camera_name):
-                success = True
+            # ストリーム設定が途中で変わることが分かっている場合、全体のストリームコピーは試行しない
+            runs = self._group_copyable_runs(video_files)
+            if len(runs) == 1:
+                # ストリームコピーを試行
+                progress_tracker.update_camera(camera_pos, 1, str(video_files[0].path), 0.0,
+                                             f"{camera_name}カメラ ストリームコピー中")
+                success = try_copy(input_paths, partial_output_file)
             else:
-                # 再エンコードを試行
+                # 設定の異なる区間のみ再エンコードし、残りはストリームコピーする
+                status = f"{camera_name}カメラ {len(runs)} 区間に分けてマージ中"
+                progress_tracker.update_camera(camera_pos, 1, str(video_files[0].path), 0.0, status)
+                success = self._merge_runs(runs, staged_paths, partial_output_file,
+                                           self._make_tracker_callback(camera_pos, status, str(final_output_file),
+                                                                       total_duration))
+
+            if not success:
+                # 失敗したマージの出力を残さないよう削除
+                self._cleanup_temp_file(partial_output_file)
                 progress_tracker.update_camera(camera_pos, 1, str(video_files[0].path), 0.0,
                                              f"{camera_name}カメラ 再エンコード中")
-                success = self._try_reencode_optimized_with_progress(list_file, temp_output_file,
-                                                                   camera_pos, camera_name)
+                output_file = temp_output_file
+                success = try_reencode(input_paths, temp_output_file)
 
-            # ローカル処理の場合、最終出力先に移動
-            if success and use_local_processing and temp_output_file != final_output_file:
-                progress_tracker.update_camera(camera_pos, len(video_files) - 1, "", total_size_mb * 0.9,
-                                             f"{camera_name}カメラ NASに移動中")
+            # 最終出力先に置き換え（ローカルで再エンコードした場合はNASに移動）
+            if success:
+                if output_file.parent != final_output_file.parent:
+                    progress_tracker.update_camera(camera_pos, len(video_files) - 1, "", total_size_mb * 0.9,
+                                                 f"{camera_name}カメラ NASに移動中")
                 try:
-                    shutil.move(str(temp_output_file), str(final_output_file))
+                    self._move_to_output(output_file, final_output_file)
                     progress_tracker.update_camera(camera_pos, len(video_files), str(final_output_file),
                                                  total_size_mb, f"{camera_name}カメラ 完了")
                 except Exception as e:
                     progress_tracker.update_camera(camera_pos, len(video_files) - 1, "", total_size_mb * 0.9,
                                                  f"{camera_name}カメラ 移動エラー: {e}")
                     success = False
-            elif success:
-                progress_tracker.update_camera(camera_pos, len(video_files), str(final_output_file),
-                                             total_size_mb, f"{camera_name}カメラ 完了")
 
         except Exception as e:
             progress_tracker.update_camera(camera_pos, 0, "", 0.0, f"{camera_name}カメラ エラー: {e}")
             success = False
 
         # 一時ファイルをクリーンアップ
-        self._cleanup_temp_file(list_file)
-        if use_local_processing and temp_output_file.exists() and temp_output_file != final_output_file:
-            self._cleanup_temp_file(temp_output_file)
+        for temp_file in (partial_output_file, temp_output_file):
+            if temp_file.exists():
+                self._cleanup_temp_file(temp_file)
+        self._cleanup_staged_inputs(staged_paths)
 
         return success
 
-    def _try_stream_copy_optimized_with_progress(self, list_file: Path, output_file: Path,
-                                               camera_pos: str, camera_name: str) -> bool:
+    def _try_stream_copy_optimized_with_progress(self, input_paths: List[Path], output_file: Path,
+                                               camera_pos: str, camera_name: str,
+                                               total_duration: float = 0.0) -> bool:
         """
         プログレス表示付きストリームコピーでマージを試行
+
+        FFmpegの -progress 出力から実際の処理位置を求めてプログレストラッカーを更新する
         """
-        copy_settings = self.config.ffmpeg_copy_settings
+        copy_settings = self._copy_settings
         cmd = [
             'ffmpeg',
+            *self._thread_args(),
             '-probesize', '32M',
             '-analyzeduration', '10M',
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', str(list_file),
+            *self._concat_input_args(),
             '-c:v', copy_settings["video"],
             '-c:a', copy_settings["audio"],
             '-avoid_negative_ts', 'make_zero',
@@ -227,23 +852,11 @@ class VideoMerger:
         ]
 
         try:
-            # FFmpegプロセスを実行してプログレスを監視
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                     text=True, universal_newlines=True)
-
-            # プログレス監視（簡易版）
-            if self.progress_tracker:
-                time.sleep(1)  # 処理時間をシミュレート
-                self.progress_tracker.update_camera(camera_pos, 1, str(output_file), 0.0,
-                                                   f"{camera_name}カメラ ストリームコピー処理中")
-
-            stdout, stderr = process.communicate()
-
-            if process.returncode == 0:
-                return True
-            else:
-                return False
-
+            on_progress = self._make_tracker_callback(camera_pos, f"{camera_name}カメラ ストリームコピー処理中",
+                                                      str(output_file), total_duration, abort_if_slow=True)
+            self._run_ffmpeg(cmd, on_progress, input_data=self._concat_listing(input_paths),
+                             output_file=output_file)
+            return True
         except subprocess.CalledProcessError:
             return False
         except FileNotFoundError:
@@ -252,76 +865,53 @@ class VideoMerger:
                                                    f"{camera_name}カメラ FFmpegエラー")
             return False
 
-    def _try_reencode_optimized_with_progress(self, list_file: Path, output_file: Path,
-                                            camera_pos: str, camera_name: str) -> bool:
+    def _try_reencode_optimized_with_progress(self, input_paths: List[Path], output_file: Path,
+                                            camera_pos: str, camera_name: str,
+                                            audio_codec: Optional[str] = None,
+                                            total_duration: float = 0.0) -> bool:
         """
         プログレス表示付き再エンコードでマージを試行
-        """
-        reencode_settings = self.config.ffmpeg_reencode_settings
-        cmd = [
-            'ffmpeg',
-            '-probesize', '32M',
-            '-analyzeduration', '10M',
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', str(list_file),
-            '-c:v', reencode_settings["video_codec"],
-            '-c:a', reencode_settings["audio_codec"],
-            '-preset', reencode_settings["preset"],
-            '-crf', reencode_settings["crf"],
-            '-avoid_negative_ts', 'make_zero',
-            '-threads', '0',
-            '-y',
-            str(output_file)
-        ]
 
+        audio_codecを指定した場合は設定の音声コーデックの代わりに使用する（"copy"で音声は再エンコードしない）
+        """
         try:
-            # FFmpegプロセスを実行してプログレスを監視
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                     text=True, universal_newlines=True)
-
-            # プログレス監視（簡易版）
-            if self.progress_tracker:
-                time.sleep(2)  # 再エンコードは時間がかかる
-                self.progress_tracker.update_camera(camera_pos, 1, str(output_file), 0.0,
-                                                   f"{camera_name}カメラ 再エンコード処理中")
-
-            stdout, stderr = process.communicate()
-
-            if process.returncode == 0:
-                return True
-            else:
-                # ファイルが作成されているかチェック
-                if output_file.exists() and output_file.stat().st_size > 0:
-                    return True
-                return False
-
+            on_progress = self._make_tracker_callback(camera_pos, f"{camera_name}カメラ 再エンコード処理中",
+                                                      str(output_file), total_duration)
+            self._run_reencode(input_paths, output_file, on_progress, audio_codec)
+            return True
         except subprocess.CalledProcessError:
-            # ファイルが作成されているかチェック
-            if output_file.exists() and output_file.stat().st_size > 0:
-                return True
+            # 途中で終了した出力で既存のファイルを置き換えないよう、作成されたファイルは削除する
+            self._cleanup_temp_file(output_file)
+            return False
+        except FileNotFoundError:
+            if self.progress_tracker:
+                self.progress_tracker.update_camera(camera_pos, 0, "", 0.0,
+                                                   f"{camera_name}カメラ FFmpegエラー")
             return False
 
-    def _try_stream_copy_optimized(self, list_file: Path, output_file: Path) -> bool:
+    def _try_stream_copy_optimized(self, input_paths: List[Path], output_file: Path,
+                                   on_progress: Optional[Callable[[Dict[str, str]], bool]] = None) -> bool:
         """
         ストリームコピーでマージを試行（NAS最適化版）
 
+        極端に低速な場合は途中で打ち切り、再エンコードに切り替える
+
         Args:
-            list_file: ファイルリストのパス
+            input_paths: 連結する入力ファイルのリスト
             output_file: 出力ファイルのパス
+            on_progress: 進捗ブロックを受け取り、続行する場合Trueを返すコールバック（省略時は進捗を表示しない）
 
         Returns:
             成功時True、失敗時False
         """
-        copy_settings = self.config.ffmpeg_copy_settings
+        copy_settings = self._copy_settings
         cmd = [
             'ffmpeg',
+            *self._thread_args(),
             # ネットワーク読み込み最適化オプション
             '-probesize', '32M',
             '-analyzeduration', '10M',
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', str(list_file),
+            *self._concat_input_args(),
             '-c:v', copy_settings["video"],
             '-c:a', copy_settings["audio"],
             '-avoid_negative_ts', 'make_zero',
@@ -331,76 +921,545 @@ class VideoMerger:
         ]
 
         try:
-            print(f"ストリームコピーでマージを試行中...")
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
-            if output_file.parent != self.config.output_dir:
-                print(f"ローカル処理完了: {output_file}")
-            else:
-                print(f"マージ完了: {output_file}")
+            self._print(f"ストリームコピーでマージを試行中...")
+            self._run_ffmpeg(cmd, on_progress, input_data=self._concat_listing(input_paths), output_file=output_file)
             return True
         except subprocess.CalledProcessError:
-            print(f"ストリームコピーに失敗。再エンコードを試行中...")
+            self._print(f"ストリームコピーに失敗。再エンコードを試行中...")
             return False
         except FileNotFoundError:
-            print("FFmpegが見つかりません。FFmpegをインストールしてください。")
+            self._print("FFmpegが見つかりません。FFmpegをインストールしてください。")
             return False
 
-    def _try_reencode_optimized(self, list_file: Path, output_file: Path) -> bool:
+    def _try_reencode_optimized(self, input_paths: List[Path], output_file: Path,
+                                on_progress: Optional[Callable[[Dict[str, str]], bool]] = None,
+                                audio_codec: Optional[str] = None) -> bool:
         """
         再エンコードでマージを試行（NAS最適化版）
 
         Args:
-            list_file: ファイルリストのパス
+            input_paths: 連結する入力ファイルのリスト
             output_file: 出力ファイルのパス
+            on_progress: 進捗ブロックを受け取り、続行する場合Trueを返すコールバック（省略時は進捗を表示しない）
+            audio_codec: 設定の代わりに使用する音声コーデック（"copy"で音声は再エンコードしない）
 
         Returns:
             成功時True、失敗時False
         """
-        reencode_settings = self.config.ffmpeg_reencode_settings
-        cmd = [
+        try:
+            self._run_reencode(input_paths, output_file, on_progress, audio_codec)
+            self._print(f"再エンコード処理完了: {output_file}")
+            return True
+        except subprocess.CalledProcessError as e:
+            # 途中で終了した出力で既存のファイルを置き換えないよう、作成されたファイルは削除する
+            self._cleanup_temp_file(output_file)
+            self._print(f"再エンコードも失敗しました")
+            if e.stderr:
+                self._print(f"FFmpegエラー出力（末尾）:\n{e.stderr}")
+            return False
+
+    def _run_reencode(self, input_paths: List[Path], output_file: Path,
+                      on_progress: Optional[Callable[[Dict[str, str]], bool]] = None,
+                      audio_codec: Optional[str] = None):
+        """
+        再エンコードを実行
+
+        ハードウェアエンコーダを使用する設定の場合はまずハードウェアで処理し、
+        失敗した場合は以降ハードウェアを使わずソフトウェアエンコードでやり直す。
+        音声をコピーして失敗した場合は、音声が失敗の原因の可能性があるため設定の音声コーデックでやり直す
+
+        Args:
+            input_paths: 連結する入力ファイルのリスト
+            output_file: 出力ファイルのパス
+            on_progress: 進捗ブロックを受け取り、続行する場合Trueを返すコールバック
+            audio_codec: 設定の代わりに使用する音声コーデック（"copy"で音声は再エンコードしない）
+
+        Raises:
+            subprocess.CalledProcessError: 再エンコードに失敗した場合
+            FileNotFoundError: FFmpegが見つからない場合
+        """
+        try:
+            self._run_reencode_once(input_paths, output_file, on_progress, audio_codec)
+        except subprocess.CalledProcessError:
+            if audio_codec != "copy":
+                raise
+            self._print("音声をコピーした再エンコードに失敗したため、音声も再エンコードします")
+            self._cleanup_temp_file(output_file)
+            self._run_reencode_once(input_paths, output_file, on_progress)
+
+    def _run_reencode_once(self, input_paths: List[Path], output_file: Path,
+                           on_progress: Optional[Callable[[Dict[str, str]], bool]] = None,
+                           audio_codec: Optional[str] = None):
+        """指定の音声コーデックで再エンコードを1回実行（ハードウェアエンコーダの失敗時のみソフトウェアでやり直す）"""
+        input_data = self._concat_listing(input_paths)
+        hw_encoder = self._hardware_encoder()
+        if hw_encoder:
+            try:
+                self._run_ffmpeg(self._reencode_cmd(output_file, audio_codec, hw_encoder), on_progress,
+                                 input_data=input_data, output_file=output_file)
+                return
+            except subprocess.CalledProcessError:
+                self._print(f"ハードウェアエンコード（{hw_encoder}）に失敗したため、ソフトウェアエンコードに切り替えます")
+                with self._hw_encoder_lock:
+                    self._hw_encoder = ""
+                self._cleanup_temp_file(output_file)
+
+        self._run_ffmpeg(self._reencode_cmd(output_file, audio_codec), on_progress,
+                         input_data=input_data, output_file=output_file)
+
+    def _reencode_cmd(self, output_file: Path, audio_codec: Optional[str] = None,
+                      hw_encoder: Optional[str] = None) -> List[str]:
+        """
+        再エンコードのFFmpegコマンドを作成
+
+        Args:
+            output_file: 出力ファイルのパス
+            audio_codec: 設定の代わりに使用する音声コーデック
+            hw_encoder: 使用するハードウェアエンコーダ（省略時は設定のソフトウェアエンコーダ）
+
+        Returns:
+            コマンドの引数リスト
+        """
+        reencode_settings = self._reencode_settings
+        if hw_encoder:
+            hwaccel, hwaccel_output_format = self.HW_DECODE_ARGS.get(hw_encoder, ("auto", None))
+            decode_args = ['-hwaccel', hwaccel]
+            if hwaccel_output_format:
+                decode_args += ['-hwaccel_output_format', hwaccel_output_format]
+            video_args = ['-c:v', hw_encoder, *self._hw_quality_args(hw_encoder, reencode_settings["crf"])]
+        else:
+            decode_args = []
+            video_args = [
+                '-c:v', reencode_settings["video_codec"],
+                '-preset', reencode_settings["preset"],
+                '-crf', reencode_settings["crf"],
+            ]
+
+        return [
             'ffmpeg',
+            *self._thread_args(),
             # ネットワーク読み込み最適化オプション
             '-probesize', '32M',
             '-analyzeduration', '10M',
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', str(list_file),
-            '-c:v', reencode_settings["video_codec"],
-            '-c:a', reencode_settings["audio_codec"],
-            '-preset', reencode_settings["preset"],
-            '-crf', reencode_settings["crf"],
+            *decode_args,
+            *self._concat_input_args(),
+            *video_args,
+            '-c:a', audio_codec or reencode_settings["audio_codec"],
             '-avoid_negative_ts', 'make_zero',
             # スレッド数最適化（CPUコア数に応じて調整）
-            '-threads', '0',
+            '-threads', str(self._ffmpeg_threads()),
+            *([] if hw_encoder else self._x264_thread_args(reencode_settings)),
             '-y',
             str(output_file)
         ]
 
+    @staticmethod
+    def _hw_quality_args(hw_encoder: str, crf: str) -> List[str]:
+        """ハードウェアエンコーダ用の画質指定を取得（CRF値を各エンコーダの同等の指定に置き換える）"""
+        if hw_encoder.endswith("_nvenc"):
+            return ['-preset', 'p4', '-cq', crf]
+        if hw_encoder.endswith("_qsv"):
+            return ['-global_quality', crf]
+        if hw_encoder.endswith("_vaapi"):
+            return ['-qp', crf]
+        if hw_encoder.endswith("_videotoolbox"):
+            # VideoToolboxはCRFに相当する指定がないため、品質値（1〜100）で指定する
+            return ['-q:v', '65']
+        return []
+
+    def _hardware_encoder(self) -> str:
+        """
+        再エンコードに使用するハードウェアエンコーダを取得
+
+        hwaccel が "auto" の場合は `ffmpeg -encoders` の結果から初回のみ判定する
+
+        Returns:
+            エンコーダ名（使用しない場合は空文字列）
+        """
+        with self._hw_encoder_lock:
+            if self._hw_encoder is None:
+                hwaccel = self.config.ffmpeg_hwaccel
+                if hwaccel == "auto":
+                    self._hw_encoder = self._detect_hw_encoder()
+                    if self._hw_encoder:
+                        self._print(f"ハードウェアエンコーダを使用します: {self._hw_encoder}")
+                elif hwaccel in ("", "off"):
+                    self._hw_encoder = ""
+                else:
+                    self._hw_encoder = hwaccel
+            return self._hw_encoder
+
+    def _detect_hw_encoder(self) -> str:
+        """FFmpegで利用可能なハードウェアエンコーダを優先順に探す（見つからない場合は空文字列）"""
         try:
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
-            if output_file.parent != self.config.output_dir:
-                print(f"再エンコード処理完了: {output_file}")
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], stdout=subprocess.PIPE,
+                                    stderr=subprocess.DEVNULL, universal_newlines=True, timeout=30)
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+        available = {fields[1] for fields in map(str.split, result.stdout.splitlines()) if len(fields) > 1}
+        return next((encoder for encoder in self.HW_ENCODER_PREFERENCE if encoder in available), "")
+
+    def _run_ffmpeg(self, cmd: List[str],
+                    on_progress: Optional[Callable[[Dict[str, str]], bool]] = None,
+                    input_data: Optional[bytes] = None,
+                    output_file: Optional[Path] = None):
+        """
+        FFmpegを実行し、出力を1行ずつ読み捨てながら処理
+
+        出力全体をメモリに溜めず、エラー報告用に標準エラー出力の末尾の数行だけを保持する。
+        on_progressを指定すると -progress を付与し、key=value の1ブロックごとに渡す。
+        コールバックがFalseを返した場合はFFmpegを中断する
+
+        Args:
+            cmd: 実行するコマンド（最後の引数が出力ファイル）
+            on_progress: 進捗ブロックを受け取り、続行する場合Trueを返すコールバック
+            input_data: 標準入力に渡すバイト列（concatのファイルリスト等）
+            output_file: 出力ファイルのパス。出力先（NAS）への直接書き込みでバッファを使用する場合、
+                FFmpegには標準出力に書き出させ、メモリバッファを介してこのパスに書き込む
+
+        Raises:
+            subprocess.CalledProcessError: 終了コードが0以外、中断、または出力の書き込みに失敗した場合
+                （stderrに末尾の出力を格納）
+            FileNotFoundError: FFmpegが見つからない場合
+        """
+        # 標準エラー出力はバイト列のまま保持し、失敗時のみデコードする
+        stderr_tail: Deque[bytes] = deque(maxlen=self.STDERR_TAIL_LINES)
+        buffer_output = self._should_buffer_output(output_file)
+        progress_read_fd = progress_write_fd = None
+
+        if buffer_output:
+            # 標準出力に書き出すため、シーク不要なフラグメント形式のMP4にする
+            cmd = [*cmd[:-1], *self._movflags_args(fragmented=True), '-f', 'mp4', 'pipe:1']
+        elif output_file is not None:
+            cmd = [*cmd[:-1], *self._movflags_args(), cmd[-1]]
+        if on_progress is not None:
+            if buffer_output:
+                # 標準出力は動画データに使うため、進捗は別のパイプで受け取る
+                progress_read_fd, progress_write_fd = os.pipe()
+                progress_target = f"pipe:{progress_write_fd}"
             else:
-                print(f"再エンコードでマージ完了: {output_file}")
-            return True
-        except subprocess.CalledProcessError:
-            # ファイルが作成されているかチェック
-            if output_file.exists() and output_file.stat().st_size > 0:
-                print(f"警告: エラーが発生しましたが、動画ファイルは作成されました: {output_file}")
-                print(f"ファイルサイズ: {output_file.stat().st_size / (1024*1024):.1f} MB")
-                return True
+                progress_target = "pipe:1"
+            cmd = [cmd[0], '-progress', progress_target, '-nostats', *cmd[1:]]
+
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if input_data is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE if buffer_output or on_progress is not None else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                pass_fds=(progress_write_fd,) if progress_write_fd is not None else ()
+            )
+        except OSError:
+            if progress_read_fd is not None:
+                os.close(progress_read_fd)
+            raise
+        finally:
+            if progress_write_fd is not None:
+                os.close(progress_write_fd)
+
+        # 標準エラー出力は別スレッドで読み捨て、標準入力の書き込み中のパイプ詰まりを防ぐ
+        stderr_thread = threading.Thread(
+            target=self._drain_stderr,
+            args=(process.stderr, stderr_tail),
+            daemon=True
+        )
+        stderr_thread.start()
+
+        writer = None
+        if buffer_output:
+            writer = _BufferedOutputWriter(process.stdout, output_file, self.config.nas_write_buffer_mb)
+            writer.start()
+
+        if input_data is not None:
+            try:
+                process.stdin.write(input_data)
+                process.stdin.close()
+            except BrokenPipeError:
+                pass  # 入力を読む前に終了した場合は終了コードで判定する
+
+        if on_progress is not None:
+            if progress_read_fd is not None:
+                progress_stream = open(progress_read_fd, 'r', encoding='utf-8', errors='replace')
             else:
-                print(f"再エンコードも失敗しました")
+                progress_stream = io.TextIOWrapper(process.stdout, encoding='utf-8', errors='replace')
+            progress: Dict[str, str] = {}
+            for line in progress_stream:
+                match = _PROGRESS_LINE.match(line.rstrip())
+                if not match:
+                    continue
+                key, value = match.groups()
+                progress[key] = value
+                # "progress=continue/end" で1ブロックが終わる
+                if key == "progress":
+                    if not on_progress(progress):
+                        process.terminate()
+                        stderr_tail.append("進捗監視により中断されました".encode("utf-8"))
+                        break
+                    progress = {}
+            progress_stream.close()
+
+        returncode = process.wait()
+        stderr_thread.join()
+        if writer is not None:
+            writer.join()
+            if writer.error is not None and returncode == 0:
+                stderr_tail.append(f"出力ファイルの書き込みに失敗しました: {writer.error}".encode("utf-8"))
+                returncode = 1
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd,
+                                                stderr=b"\n".join(stderr_tail).decode("utf-8", errors="replace"))
+
+    def _movflags_args(self, fragmented: bool = False) -> List[str]:
+        """
+        MP4出力の -movflags 指定を取得
+
+        Args:
+            fragmented: シークできない出力先のため、フラグメント形式を必須にするかどうか
+
+        Returns:
+            -movflags の引数リスト（指定なしの場合は空）
+        """
+        flags = [flag for flag in self.config.ffmpeg_movflags.split("+") if flag]
+        if fragmented:
+            # faststartは書き込み後のシークが必要なため、フラグメント形式とは併用しない
+            flags = ["frag_keyframe", "empty_moov",
+                     *(flag for flag in flags if flag not in ("faststart", "frag_keyframe", "empty_moov"))]
+        return ['-movflags', "+" + "+".join(flags)] if flags else []
+
+    def _should_buffer_output(self, output_file: Optional[Path]) -> bool:
+        """
+        出力先（NAS）への直接書き込みにメモリバッファを使用するかを判定
+
+        フラグメント形式のMP4になるため設定で有効にした場合のみ使用する。
+        進捗を別のパイプで受け取るためPOSIX環境に限る
+        """
+        return (output_file is not None and os.name == "posix"
+                and self.config.nas_write_buffer_mb > 0
+                and output_file.parent == self.config.output_dir)
+
+    @staticmethod
+    def _drain_stderr(stream, stderr_tail: Deque[bytes]):
+        """標準エラー出力をデコードせずに読み切り、末尾の行だけを保持"""
+        for line in stream:
+            line = line.rstrip()
+            if line:
+                stderr_tail.append(line)
+        stream.close()
+
+    def _make_progress_callback(self, total_duration: float,
+                                abort_if_slow: bool = False) -> Callable[[Dict[str, str]], bool]:
+        """
+        FFmpegの進捗を表示するコールバックを作成
+
+        Args:
+            total_duration: 入力全体の再生時間（秒、0は不明）
+            abort_if_slow: 開始直後の処理速度が極端に遅い場合に中断するかどうか
+
+        Returns:
+            進捗ブロックを受け取り、続行する場合Trueを返すコールバック
+        """
+        # 端末以外（並列実行時の出力キャプチャ等）では1行上書き表示を行わない
+        show = self._log_stream().isatty()
+        start_time = time.time()
+
+        def on_progress(progress: Dict[str, str]) -> bool:
+            out_time = _parse_out_time(progress)
+            speed = _parse_speed(progress)
+
+            if show:
+                line = f"\r  進捗: {self._format_seconds(out_time)}"
+                if total_duration > 0:
+                    line += f" / {self._format_seconds(total_duration)} ({min(100.0, out_time / total_duration * 100):5.1f}%)"
+                if speed is not None:
+                    line += f" 速度: {speed:.1f}x"
+                self._print(line, end="\n" if progress.get("progress") == "end" else "", flush=True)
+
+            if abort_if_slow and self._is_too_slow(speed, start_time):
+                if show:
+                    self._print()
+                self._print(f"ストリームコピーが低速なため中断します（速度: {speed:.2f}x）")
                 return False
+            return True
+
+        return on_progress
+
+    def _make_tracker_callback(self, camera_pos: str, status: str, current_file_name: str,
+                               total_duration: float,
+                               abort_if_slow: bool = False) -> Callable[[Dict[str, str]], bool]:
+        """
+        FFmpegの進捗をプログレストラッカーに反映するコールバックを作成
+
+        Args:
+            camera_pos: プログレストラッカー上のカメラ位置
+            status: 表示するステータス
+            current_file_name: 処理中として表示するファイル名
+            total_duration: 入力全体の再生時間（秒、0は不明）
+            abort_if_slow: 開始直後の処理速度が極端に遅い場合に中断するかどうか
+
+        Returns:
+            進捗ブロックを受け取り、続行する場合Trueを返すコールバック
+        """
+        start_time = time.time()
+        last_update = 0.0
+
+        def on_progress(progress: Dict[str, str]) -> bool:
+            nonlocal last_update
+            speed = _parse_speed(progress)
+            now = time.time()
+            # 更新が頻繁な場合は間引く（最後の進捗は必ず反映する）
+            if (self.progress_tracker and total_duration > 0
+                    and (now - last_update >= self.TRACKER_UPDATE_INTERVAL or progress.get("progress") == "end")):
+                last_update = now
+                fraction = min(1.0, _parse_out_time(progress) / total_duration)
+                self.progress_tracker.update_camera_fraction(camera_pos, fraction, current_file_name, status)
+            return not (abort_if_slow and self._is_too_slow(speed, start_time))
+
+        return on_progress
+
+    def _is_too_slow(self, speed: Optional[float], start_time: float) -> bool:
+        """開始から猶予時間を過ぎてもストリームコピーが極端に低速かどうかを判定"""
+        return (speed is not None and speed < self.COPY_ABORT_SPEED
+                and time.time() - start_time >= self.COPY_ABORT_GRACE_SECONDS)
+
+    @staticmethod
+    def _format_seconds(seconds: float) -> str:
+        """秒を HH:MM:SS 形式に変換"""
+        seconds = int(seconds)
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+    def _ffmpeg_threads(self) -> int:
+        """
+        FFmpegに渡すスレッド数を取得（0は自動）
+
+        並列マージ用のジョブ単位の指定を、全体の指定より優先する。どちらも自動の場合、
+        並列実行中は各FFmpegが全コア分のスレッドを起動して奪い合わないよう、コア数を同時実行数で割り当てる
+        """
+        threads = self.config.ffmpeg_threads_per_job or self.config.ffmpeg_threads
+        if threads == 0 and self._concurrent_jobs > 1:
+            threads = max(1, (os.cpu_count() or 1) // self._concurrent_jobs)
+        return threads
+
+    def _thread_args(self) -> List[str]:
+        """
+        入力側のスレッド指定を取得
+
+        並列マージ時にFFmpegがコアを奪い合わないよう、設定時のみ付与する
+        """
+        threads = self._ffmpeg_threads()
+        return ['-threads', str(threads)] if threads > 0 else []
+
+    def _concat_input_args(self) -> List[str]:
+        """
+        標準入力から渡すconcatファイルリストを入力とする引数を取得
+
+        NASの応答が一時的に遅れてもパケットキューが詰まらないよう、入力キューを拡張する
+        """
+        return ['-thread_queue_size', str(self.INPUT_THREAD_QUEUE_SIZE),
+                '-f', 'concat', '-safe', '0', '-protocol_whitelist', 'file,pipe', '-i', 'pipe:0']
+
+    def _x264_thread_args(self, reencode_settings: Dict[str, str]) -> List[str]:
+        """libx264使用時のスレッド数の上限指定を取得（スループットの高いフレーム並列のまま上限のみ設ける）"""
+        threads = self._ffmpeg_threads()
+        if threads > 0 and reencode_settings["video_codec"] == "libx264":
+            return ['-x264-params', f"threads={threads}"]
+        return []
+
+    def _reencode_output_file(self, final_output_file: Path, use_local_processing: bool) -> Path:
+        """
+        再エンコード時の出力先を取得
+
+        I/O中心のストリームコピーは出力先（NAS）に直接書き込んでも遅くならないため、
+        CPU負荷が高く書き込みが断続的になる再エンコードのみ、ローカル処理時は一時ディレクトリで処理する
+
+        Args:
+            final_output_file: 最終的な出力ファイルのパス
+            use_local_processing: ローカル処理を使用するかどうか
+
+        Returns:
+            再エンコードの出力先（ローカル処理でない場合は出力先と同じディレクトリの一時ファイル）
+        """
+        if use_local_processing:
+            return Path(tempfile.gettempdir()) / final_output_file.name
+        return self._partial_output_file(final_output_file)
+
+    @staticmethod
+    def _partial_output_file(final_output_file: Path) -> Path:
+        """
+        出力先と同じディレクトリに書き込む途中のファイルのパスを取得
+
+        完成後にリネームで置き換えるため、失敗しても既存の出力ファイルは残る。
+        FFmpegが出力形式を判定できるよう拡張子は変えない
+        """
+        return final_output_file.with_name(f".{final_output_file.stem}.partial{final_output_file.suffix}")
+
+    def _move_to_output(self, source: Path, destination: Path):
+        """
+        処理済みファイルを出力先に移動
+
+        同一ファイルシステムであればリネームのみで済ませ、
+        別デバイスの場合は出力先のディレクトリにコピー（Linuxではsendfileによるカーネル内コピー）してから
+        置き換え、元ファイルを削除する。コピーが途中で失敗しても既存の出力ファイルは残る
+
+        Args:
+            source: 処理済みファイルのパス
+            destination: 出力先のパス
+
+        Raises:
+            OSError: 移動に失敗した場合
+        """
+        try:
+            os.replace(source, destination)
+        except OSError:
+            partial_file = self._partial_output_file(destination)
+            try:
+                shutil.copyfile(source, partial_file)
+                os.replace(partial_file, destination)
+            except OSError:
+                self._cleanup_temp_file(partial_file)
+                raise
+            self._cleanup_temp_file(source)
+
+    def _link_or_copy(self, source: Path, destination: Path) -> bool:
+        """
+        ファイルをハードリンクで出力し、できない場合はコピーする
+
+        既存の出力ファイルは、新しいファイルを用意できてから置き換える
+
+        Args:
+            source: 元ファイルのパス
+            destination: 出力先のパス
+
+        Returns:
+            成功時True、失敗時False
+        """
+        partial_file = self._partial_output_file(destination)
+        self._cleanup_temp_file(partial_file)
+        try:
+            os.link(source, partial_file)
+        except OSError:
+            pass  # 別デバイス・非対応のファイルシステムの場合はコピーにフォールバック
+
+        try:
+            if not partial_file.exists():
+                # shutil.copyfileはLinuxではos.sendfileによりカーネル内でコピーされる
+                shutil.copyfile(source, partial_file)
+            # FFmpegの -y と同様に既存の出力は上書きする
+            os.replace(partial_file, destination)
+            return True
+        except OSError as e:
+            self._print(f"ファイルコピーエラー: {e}")
+            self._cleanup_temp_file(partial_file)
+            return False
 
-    def _cleanup_temp_file(self, list_file: Path):
+    def _cleanup_temp_file(self, temp_file: Path):
         """
         一時ファイルを削除
 
         Args:
-            list_file: 削除するファイルのパス
+            temp_file: 削除するファイルのパス
         """
         try:
-            list_file.unlink()
+            temp_file.unlink()
         except OSError:
             pass  # 一時ファイルの削除に失敗しても続行
\ No newline at end of file
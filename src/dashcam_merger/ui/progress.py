@@ -4,42 +4,90 @@
 リアルタイムプログレスバーと処理状況表示を提供
 """
 
+import shutil
+import sys
 import time
 import threading
-from typing import Dict, Optional, Any
-from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass, field, replace
 
+# 経過時間の計測用の時計（時刻補正の影響を受けない単調時計。属性参照を省くためモジュールで束縛しておく）
+_now = time.monotonic
 
-@dataclass
+# カーソルを左上に戻す / 行末まで消去 / 行末まで消去して改行 / カーソル以降を消去（ANSI escape sequence）
+_CURSOR_HOME = "\033[H"
+_ERASE_TO_LINE_END = "\033[K"
+_ERASE_LINE_END = _ERASE_TO_LINE_END + "\n"
+_ERASE_BELOW = "\033[J"
+
+
+@lru_cache(maxsize=None)
+def _cursor_to_row(row: int) -> str:
+    """カーソルを指定行（1始まり）の先頭に移動するエスケープシーケンスを取得（行ごとに作成済みのものを再利用）"""
+    return f"\033[{row};1H"
+
+
+@lru_cache(maxsize=4096)
+def _format_whole_seconds(seconds: int) -> str:
+    """秒（整数）を読みやすい形式でフォーマット（同じ値は結果を再利用する）"""
+    if seconds < 60:
+        return f"{seconds}s"
+    elif seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60}s"
+    else:
+        return f"{seconds // 3600}h{seconds % 3600 // 60}m"
+
+
+# Python 3.10以降では __slots__ 付きのデータクラスにし、属性参照を高速化・省メモリ化する
+_DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _build_bars(width: int) -> Tuple[str, ...]:
+    """塗りつぶし幅 0〜width のプログレスバー文字列を事前に作成"""
+    return tuple("█" * filled + "░" * (width - filled) for filled in range(width + 1))
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class ProgressInfo:
     """プログレス情報を管理するデータクラス"""
     current: int = 0
     total: int = 0
     current_file: str = ""
+    basename: str = ""  # current_fileのファイル名部分（更新時に求めておく）
     current_size_mb: float = 0.0
     total_size_mb: float = 0.0
-    start_time: float = field(default_factory=time.time)
+    start_time: float = field(default_factory=_now)
     status: str = "待機中"
 
     @property
     def percentage(self) -> float:
-        """進捗率を計算"""
-        if self.total == 0:
+        """進捗率を計算（未着手・完了時は除算しない）"""
+        total = self.total
+        current = self.current
+        if total == 0:
             return 0.0
-        return min(100.0, (self.current / self.total) * 100)
+        if current >= total:
+            return 100.0
+        return current * 100.0 / total
 
     @property
     def elapsed_time(self) -> float:
         """経過時間を計算"""
-        return time.time() - self.start_time
+        return _now() - self.start_time
 
     @property
     def estimated_remaining(self) -> float:
-        """残り時間を推定"""
-        if self.current == 0 or self.percentage == 0:
+        """残り時間を推定（経過時間 × 残り件数 ÷ 処理済み件数）"""
+        return self._remaining(self.elapsed_time)
+
+    def _remaining(self, elapsed: float) -> float:
+        """経過時間から残り時間を推定（未着手・完了時は0）"""
+        current = self.current
+        total = self.total
+        if current == 0 or current >= total:
             return 0.0
-        elapsed = self.elapsed_time
-        return (elapsed / self.percentage) * (100 - self.percentage)
+        return elapsed * (total - current) / current
 
     @property
     def processing_speed_mb_s(self) -> float:
@@ -49,10 +97,42 @@ class ProgressInfo:
             return 0.0
         return self.current_size_mb / elapsed
 
+    def timing(self) -> Tuple[float, float, float]:
+        """
+        経過時間・残り時間・処理速度（MB/s）をまとめて計算
+
+        各プロパティを個別に参照すると現在時刻の取得が重複するため、描画時はこちらを使う
+
+        Returns:
+            (経過時間, 残り時間, 処理速度) のタプル
+        """
+        elapsed = _now() - self.start_time
+        remaining = self._remaining(elapsed)
+        speed = 0.0 if elapsed == 0 else self.current_size_mb / elapsed
+        return elapsed, remaining, speed
+
 
 class ProgressTracker:
     """プログレス追跡と表示を管理するクラス"""
 
+    # プログレスバーの幅（文字数）
+    BAR_WIDTH = 40
+
+    # 再描画する最短間隔（秒）
+    RENDER_INTERVAL = 0.1
+
+    # カメラ別・全体表示のバーとファイル数・サイズ行のテンプレート
+    # （描画時は _bar_block で % により一度に埋め込む）
+    _CAMERA_TEMPLATE = "\n".join([
+        "┌─ %s ─",
+        "│ [%s] %5.1f%%",
+        "│ ファイル: %d/%d | サイズ: %.1f/%.1fMB",
+    ])
+    _OVERALL_TEMPLATE = "\n".join([
+        "全体進捗: [%s] %5.1f%%",
+        "ファイル: %d/%d | サイズ: %.1f/%.1fMB",
+    ])
+
     def __init__(self, show_progress: bool = True, progress_style: str = "bar"):
         """
         初期化
@@ -63,67 +143,143 @@ class ProgressTracker:
         """
         self.show_progress = show_progress
         self.progress_style = progress_style
+        # 描画先は作成時の標準出力に固定する（ワーカースレッドでの出力の切り替え等の影響を受けない）
+        self._stream = sys.stdout
+        # 端末以外（ファイルへのリダイレクト等）では上書き表示が意味をなさないため、逐次表示を行わない
+        self._is_tty = self._stream.isatty()
+        # 各カメラの進捗は更新のたびに新しいProgressInfoに差し替える（書き換えはしない）。
+        # 辞書の値の代入はGILにより不可分なため、表示側はロックなしで一貫した値を読める
         self.cameras: Dict[str, ProgressInfo] = {}
         self.overall = ProgressInfo()
-        self._display_thread: Optional[threading.Thread] = None
+        # 描画のたびに文字列を組み立てないよう、幅ごとのバーを事前に作成しておく
+        self._bars = _build_bars(self.BAR_WIDTH)
+        # 進捗を更新したスレッドでは描画せず、描画用のスレッドに通知して間隔を空けて描画する
+        self._displaying = False
+        # 前回描画したバースタイルの各行（Noneは次回の描画で全体を描き直す）と、その時の端末の行数
+        self._last_frame: Optional[List[str]] = None
+        self._last_height = 0
+        # 描画用のスレッドと、その起床（未描画の更新あり）・停止の通知
+        self._flush_thread: Optional[threading.Thread] = None
+        self._pending = threading.Event()
         self._stop_display = threading.Event()
-        self._lock = threading.Lock()
 
     def add_camera(self, camera_pos: str, camera_name: str, total_files: int, total_size_mb: float):
         """カメラの進捗追跡を開始"""
-        with self._lock:
-            self.cameras[camera_pos] = ProgressInfo(
-                total=total_files,
-                total_size_mb=total_size_mb,
-                status=f"{camera_name}カメラ待機中"
-            )
-            self._update_overall()
+        self.cameras[camera_pos] = ProgressInfo(
+            total=total_files,
+            total_size_mb=total_size_mb,
+            status=f"{camera_name}カメラ待機中"
+        )
+        self._on_update()
 
     def update_camera(self, camera_pos: str, current_file: int, current_file_name: str,
                      processed_size_mb: float, status: str):
         """カメラの進捗を更新"""
-        with self._lock:
-            if camera_pos in self.cameras:
-                progress = self.cameras[camera_pos]
-                progress.current = current_file
-                progress.current_file = current_file_name
-                progress.current_size_mb = processed_size_mb
-                progress.status = status
-                self._update_overall()
-
-    def _update_overall(self):
-        """全体の進捗を更新"""
-        total_files = sum(cam.total for cam in self.cameras.values())
-        current_files = sum(cam.current for cam in self.cameras.values())
-        total_size = sum(cam.total_size_mb for cam in self.cameras.values())
-        current_size = sum(cam.current_size_mb for cam in self.cameras.values())
-
-        self.overall.total = total_files
-        self.overall.current = current_files
-        self.overall.total_size_mb = total_size
-        self.overall.current_size_mb = current_size
-        self.overall.status = f"全体処理中 ({len([c for c in self.cameras.values() if c.current > 0])}/{len(self.cameras)} カメラ)"
+        progress = self.cameras.get(camera_pos)
+        if progress is not None:
+            self.cameras[camera_pos] = replace(progress, current=current_file, current_file=current_file_name,
+                                               basename=self._basename(progress, current_file_name),
+                                               current_size_mb=processed_size_mb, status=status)
+            self._on_update()
+
+    def update_camera_fraction(self, camera_pos: str, fraction: float, current_file_name: str, status: str):
+        """
+        処理済みの割合（0.0〜1.0）からカメラの進捗を更新
+
+        ファイル数・サイズは登録時の合計に割合を掛けて求める
+        """
+        progress = self.cameras.get(camera_pos)
+        if progress is not None:
+            self.cameras[camera_pos] = replace(progress, current=int(progress.total * fraction),
+                                               current_file=current_file_name,
+                                               basename=self._basename(progress, current_file_name),
+                                               current_size_mb=progress.total_size_mb * fraction, status=status)
+            self._on_update()
+
+    @staticmethod
+    def _basename(progress: ProgressInfo, current_file_name: str) -> str:
+        """処理中ファイルのファイル名部分を取得（前回と同じファイルなら求め直さない）"""
+        if current_file_name == progress.current_file:
+            return progress.basename
+        return current_file_name.rsplit('/', 1)[-1]
+
+    def _snapshot(self) -> List[Tuple[str, ProgressInfo]]:
+        """
+        表示用に各カメラの進捗を取り出し、全体の進捗を更新
+
+        Returns:
+            (カメラ位置, 進捗) のリスト
+        """
+        cameras = list(self.cameras.items())
+
+        # 全体の合計は1回の走査でまとめて求める
+        total = current = started = 0
+        total_size_mb = current_size_mb = 0.0
+        for _, progress in cameras:
+            total += progress.total
+            current += progress.current
+            total_size_mb += progress.total_size_mb
+            current_size_mb += progress.current_size_mb
+            if progress.current > 0:
+                started += 1
+
+        self.overall = replace(
+            self.overall,
+            total=total,
+            current=current,
+            total_size_mb=total_size_mb,
+            current_size_mb=current_size_mb,
+            status=f"全体処理中 ({started}/{len(cameras)} カメラ)"
+        )
+        return cameras
 
     def start_display(self):
-        """プログレス表示を開始"""
-        if not self.show_progress:
+        """プログレス表示を開始（端末以外では最終サマリーのみ表示する）"""
+        if not self.show_progress or not self._is_tty:
             return
 
+        self._displaying = True
+        # 表示停止中に他の出力で画面が変わっている可能性があるため、最初は全体を描き直す
+        self._last_frame = None
+
         self._stop_display.clear()
-        self._display_thread = threading.Thread(target=self._display_loop, daemon=True)
-        self._display_thread.start()
+        self._pending.set()  # 最初の描画も描画用のスレッドで行う
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
 
     def stop_display(self):
-        """プログレス表示を停止"""
-        if self._display_thread:
+        """プログレス表示を停止（最新の進捗を描画してから停止する）"""
+        if self._flush_thread:
+            # Event.waitで待機しているため、待ち時間を残さずすぐに終了する
             self._stop_display.set()
-            self._display_thread.join(timeout=1.0)
+            self._pending.set()
+            self._flush_thread.join()
+            self._flush_thread = None
+        if self._displaying:
+            # 描画用のスレッドは終了済みのため、ここでの描画が他と重なることはない
+            self._render_progress()
+            self._displaying = False
 
-    def _display_loop(self):
-        """プログレス表示のメインループ"""
-        while not self._stop_display.is_set():
+    def _flush_loop(self):
+        """
+        更新があれば描画し、次の描画まで間隔を空ける
+
+        描画はこのスレッド（と停止時のstop_display）のみで行い、進捗を更新したスレッドでは描画しない
+        """
+        while True:
+            self._pending.wait()
+            if self._stop_display.is_set():
+                return
+            self._pending.clear()
             self._render_progress()
-            time.sleep(0.5)  # 500ms間隔で更新
+            # 待機中に停止された場合は最終描画をstop_displayに任せる
+            if self._stop_display.wait(timeout=self.RENDER_INTERVAL):
+                return
+
+    def _on_update(self):
+        """進捗の更新を描画用のスレッドに通知（描画はしない）"""
+        if self._displaying:
+            self._pending.set()
 
     def _render_progress(self):
         """プログレス表示をレンダリング"""
@@ -134,86 +290,110 @@ class ProgressTracker:
 
     def _render_bar_style(self):
         """バースタイルのプログレス表示"""
-        with self._lock:
-            # 画面をクリア（ANSI escape sequence）
-            print("\033[2J\033[H", end="")
+        lines = ["=== Dashcam Video Merger - 処理進捗 ===", ""]
+
+        # 各カメラの進捗表示
+        for camera_pos, progress in self._snapshot():
+            self._render_camera_progress(camera_pos, progress, lines)
+            lines.append("")
 
-            print("=== Dashcam Video Merger - 処理進捗 ===\n")
+        # 全体進捗表示
+        lines.append("=" * 50)
+        self._render_overall_progress(lines)
+        lines.append("")
 
-            # 各カメラの進捗表示
-            for camera_pos, progress in self.cameras.items():
-                self._render_camera_progress(camera_pos, progress)
-                print()
+        # テンプレートから作った複数行の要素を1行ずつに分ける
+        rows = "\n".join(lines).split("\n")
 
-            # 全体進捗表示
-            print("=" * 50)
-            self._render_overall_progress()
-            print()
+        # 行の書き換えは画面上の絶対位置で行うため、画面に収まらない場合は全体進捗を含む末尾の行のみを表示する
+        # （カーソルを戻す表示の直後の行も画面内に残す）
+        height = shutil.get_terminal_size().lines
+        if len(rows) > height - 1:
+            rows = rows[-max(1, height - 1):]
 
-    def _render_camera_progress(self, camera_pos: str, progress: ProgressInfo):
-        """カメラ別プログレス表示"""
-        bar_width = 40
-        filled_width = int(bar_width * progress.percentage / 100)
-        bar = "█" * filled_width + "░" * (bar_width - filled_width)
+        # 端末の大きさが変わった場合は前回の行の位置が当てにならないため、全体を描き直す
+        previous = self._last_frame if height == self._last_height else None
 
-        print(f"┌─ {progress.status} ─")
-        print(f"│ [{bar}] {progress.percentage:5.1f}%")
-        print(f"│ ファイル: {progress.current}/{progress.total} | "
-              f"サイズ: {progress.current_size_mb:.1f}/{progress.total_size_mb:.1f}MB")
+        if previous is None:
+            # 画面全体を消去せず、カーソルを先頭に戻して各行を上書きする（ANSI escape sequence）
+            output = _CURSOR_HOME + "".join(row + _ERASE_LINE_END for row in rows) + _ERASE_BELOW
+        else:
+            # 前回から変わった行だけをカーソル移動で書き換える
+            parts = [
+                _cursor_to_row(number) + row + _ERASE_TO_LINE_END
+                for number, row in enumerate(rows, 1)
+                if number > len(previous) or previous[number - 1] != row
+            ]
+            if len(rows) < len(previous):
+                parts.append(_cursor_to_row(len(rows) + 1) + _ERASE_BELOW)
+            if not parts:
+                return
+            # 他の出力が表示の途中に書き込まれないよう、カーソルは表示の末尾に戻しておく
+            parts.append(_cursor_to_row(len(rows) + 1))
+            output = "".join(parts)
+
+        # 1フレーム分をまとめて1回で書き込み、ちらつきを防ぐ
+        self._stream.write(output)
+        self._stream.flush()
+        # 書き込めた場合のみ、次回の差分描画の基準にする
+        self._last_frame = rows
+        self._last_height = height
+
+    def _render_camera_progress(self, camera_pos: str, progress: ProgressInfo, lines: List[str]):
+        """カメラ別プログレス表示の行を追加"""
+        lines.append(self._bar_block(self._CAMERA_TEMPLATE, progress, progress.status))
 
         if progress.current > 0:
-            remaining_time = progress.estimated_remaining
-            speed = progress.processing_speed_mb_s
-            print(f"│ 残り時間: {self._format_time(remaining_time)} | "
-                  f"速度: {speed:.1f}MB/s")
-            if progress.current_file:
-                filename = progress.current_file.split('/')[-1]  # ファイル名のみ
-                print(f"│ 処理中: {filename}")
-
-        print("└" + "─" * 48)
-
-    def _render_overall_progress(self):
-        """全体プログレス表示"""
-        bar_width = 40
-        filled_width = int(bar_width * self.overall.percentage / 100)
-        bar = "█" * filled_width + "░" * (bar_width - filled_width)
-
-        print(f"全体進捗: [{bar}] {self.overall.percentage:5.1f}%")
-        print(f"ファイル: {self.overall.current}/{self.overall.total} | "
-              f"サイズ: {self.overall.current_size_mb:.1f}/{self.overall.total_size_mb:.1f}MB")
-
-        if self.overall.current > 0:
-            elapsed = self.overall.elapsed_time
-            remaining = self.overall.estimated_remaining
-            speed = self.overall.processing_speed_mb_s
-            print(f"経過時間: {self._format_time(elapsed)} | "
-                  f"残り時間: {self._format_time(remaining)} | "
-                  f"平均速度: {speed:.1f}MB/s")
+            _, remaining_time, speed = progress.timing()
+            lines.append(f"│ 残り時間: {self._format_time(remaining_time)} | "
+                         f"速度: {speed:.1f}MB/s")
+            if progress.basename:
+                lines.append(f"│ 処理中: {progress.basename}")
+
+        lines.append("└" + "─" * 48)
+
+    def _render_overall_progress(self, lines: List[str]):
+        """全体プログレス表示の行を追加"""
+        overall = self.overall
+        lines.append(self._bar_block(self._OVERALL_TEMPLATE, overall))
+
+        if overall.current > 0:
+            elapsed, remaining, speed = overall.timing()
+            lines.append(f"経過時間: {self._format_time(elapsed)} | "
+                         f"残り時間: {self._format_time(remaining)} | "
+                         f"平均速度: {speed:.1f}MB/s")
+
+    def _bar_block(self, template: str, progress: ProgressInfo, *leading: str) -> str:
+        """
+        バーとファイル数・サイズの行をテンプレートから作成
+
+        Args:
+            template: _CAMERA_TEMPLATE 等のテンプレート
+            progress: 表示する進捗
+            leading: バーより前に埋め込む値（カメラ別表示のステータス等）
+
+        Returns:
+            複数行の文字列
+        """
+        percentage = progress.percentage
+        return template % (*leading, self._bars[int(self.BAR_WIDTH * percentage / 100)], percentage,
+                           progress.current, progress.total, progress.current_size_mb, progress.total_size_mb)
 
     def _render_simple_style(self):
         """シンプルスタイルのプログレス表示"""
-        with self._lock:
-            status_lines = []
-            for camera_pos, progress in self.cameras.items():
-                status_lines.append(f"{progress.status}: {progress.percentage:.1f}% "
-                                  f"({progress.current}/{progress.total})")
+        status_lines = [
+            f"{progress.status}: {progress.percentage:.1f}% ({progress.current}/{progress.total})"
+            for _, progress in self._snapshot()
+        ]
+        status_lines.append(f"全体: {self.overall.percentage:.1f}% ({self.overall.current}/{self.overall.total})")
 
-            status_lines.append(f"全体: {self.overall.percentage:.1f}% "
-                              f"({self.overall.current}/{self.overall.total})")
-
-            # 一行で表示（前の行を上書き）
-            print(f"\r{' | '.join(status_lines)}", end="", flush=True)
+        # 一行で表示（前の行を上書きし、前回より短い場合の残りは消去する）
+        self._stream.write("\r" + " | ".join(status_lines) + _ERASE_TO_LINE_END)
+        self._stream.flush()
 
     def _format_time(self, seconds: float) -> str:
-        """時間を読みやすい形式でフォーマット"""
-        if seconds < 60:
-            return f"{seconds:.0f}s"
-        elif seconds < 3600:
-            return f"{seconds // 60:.0f}m{seconds % 60:.0f}s"
-        else:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            return f"{hours:.0f}h{minutes:.0f}m"
+        """時間を読みやすい形式でフォーマット（表示は秒単位のため整数に丸めてから変換）"""
+        return _format_whole_seconds(round(seconds))
 
     def print_final_summary(self):
         """最終結果サマリーを表示"""
@@ -224,7 +404,7 @@ class ProgressTracker:
         print("処理完了サマリー")
         print("=" * 50)
 
-        for camera_pos, progress in self.cameras.items():
+        for camera_pos, progress in self._snapshot():
             elapsed = progress.elapsed_time
             avg_speed = progress.processing_speed_mb_s
             print(f"{progress.status}: {progress.total}ファイル "
@@ -249,7 +429,11 @@ class SimpleProgressBar:
         self.current = 0
         self.description = description
         self.width = width
-        self.start_time = time.time()
+        self._bars = _build_bars(width)
+        self.start_time = _now()
+        # 前回表示した進捗率（0.1%単位）と説明（見た目が変わらない場合は再表示しない）
+        self._last_shown_pct_tenths = -1
+        self._last_description: Optional[str] = None
 
     def update(self, amount: int = 1, description: str = None):
         """プログレスを更新"""
@@ -261,10 +445,16 @@ class SimpleProgressBar:
     def _display(self):
         """プログレスバーを表示"""
         percentage = (self.current / self.total) * 100 if self.total > 0 else 0
+        pct_tenths = int(percentage * 10)
+        if pct_tenths == self._last_shown_pct_tenths and self.description == self._last_description:
+            return
+        self._last_shown_pct_tenths = pct_tenths
+        self._last_description = self.description
+
         filled_width = int(self.width * self.current / self.total) if self.total > 0 else 0
-        bar = "█" * filled_width + "░" * (self.width - filled_width)
+        bar = self._bars[filled_width]
 
-        elapsed = time.time() - self.start_time
+        elapsed = _now() - self.start_time
         if self.current > 0 and elapsed > 0:
             speed = self.current / elapsed
             remaining = (self.total - self.current) / speed if speed > 0 else 0
@@ -277,14 +467,7 @@ class SimpleProgressBar:
 
     def _format_time(self, seconds: float) -> str:
         """時間フォーマット"""
-        if seconds < 60:
-            return f"{seconds:.0f}s"
-        elif seconds < 3600:
-            return f"{seconds // 60:.0f}m{seconds % 60:.0f}s"
-        else:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            return f"{hours:.0f}h{minutes:.0f}m"
+        return _format_whole_seconds(round(seconds))
 
     def close(self):
         """プログレスバーを終了"""
@@ -0,0 +1,81 @@
+"""
+動画マージ処理のテスト
+"""
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from dashcam_merger.core.config import Config
+from dashcam_merger.core.models import VideoFile
+from dashcam_merger.processors.video_merger import VideoMerger
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="FFmpegがインストールされていません"
+)
+
+
+def _make_config(tmp_path: Path) -> Config:
+    """テスト用の設定ファイルを作成して読み込む"""
+    camera_dir = tmp_path / "F"
+    camera_dir.mkdir()
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({
+        "camera_paths": {"F": str(camera_dir)},
+        "output_dir": str(output_dir),
+        "camera_names": {"F": "フロント"},
+        "video_pattern": "NO(\\d{8})-(\\d{6})-(\\d{6})([FB])\\.MP4",
+        "performance_settings": {"use_local_processing": False, "parallel_jobs": 1},
+    }), encoding="utf-8")
+    return Config(str(config_path))
+
+
+def _make_clip(path: Path, seconds: int):
+    """テストパターンの短い動画（H.264 + AAC）を作成"""
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=30:duration={seconds}",
+         "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+         "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", "-y", str(path)],
+        check=True
+    )
+
+
+def _duration(path: Path) -> float:
+    """ffprobeで再生時間（秒）を取得"""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", str(path)],
+        stdout=subprocess.PIPE, check=True, universal_newlines=True
+    )
+    return float(result.stdout)
+
+
+def test_concat_listing_opens_entries_as_local_files():
+    """標準入力から読むリストの各パスが pipe: を基準に解決されないよう file: を付ける"""
+    listing = VideoMerger._concat_listing([Path("/videos/a.MP4"), Path("/videos/it's.MP4")])
+
+    assert listing == b"file 'file:/videos/a.MP4'\nfile 'file:/videos/it'\\''s.MP4'\n"
+
+
+@requires_ffmpeg
+def test_merge_videos_concatenates_two_clips(tmp_path):
+    """2ファイルのリストを標準入力から渡してFFmpegで連結できる"""
+    config = _make_config(tmp_path)
+    clips = []
+    for index, time_str in enumerate(("100000", "100100"), 1):
+        filename = f"NO20250906-{time_str}-{index:06d}F.MP4"
+        path = config.camera_paths["F"] / filename
+        _make_clip(path, 1)
+        clips.append(VideoFile(path, "20250906", time_str, f"{index:06d}", "F", filename))
+
+    merger = VideoMerger(config)
+    assert merger.merge_videos(clips, "20250906", "F", use_local_processing=False)
+
+    output_file = config.output_dir / "merged_2025-09-06_F.mp4"
+    assert output_file.exists()
+    assert _duration(output_file) == pytest.approx(2.0, abs=0.3)